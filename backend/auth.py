@@ -1,20 +1,41 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
+import logging
 import os
+import secrets
+import time
+import uuid
 from models import TokenData
 from database import Database
+from cache import principal_cache
+
+logger = logging.getLogger(__name__)
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop; calls beyond the pending cap are shed instead of queueing without bound.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_pending_hashes = 0
+
 # JWT settings
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
+# Opt-in: tokens carry the admin's name and role, and requests are authorized
+# from the claims alone. Revocations still apply in both modes.
+STATELESS_TOKENS = os.getenv("AUTH_STATELESS_TOKENS", "false").lower() == "true"
+REVOCATION_REFRESH_SECONDS = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "10"))
+
 # Security scheme
 security = HTTPBearer()
 
@@ -26,19 +47,160 @@ def get_password_hash(password):
     """Hash password"""
     return pwd_context.hash(password)
 
+async def run_password_hashing(func, *args):
+    """Run a bcrypt call on the hashing pool without blocking the event loop"""
+    global _pending_hashes
+    if _pending_hashes >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _pending_hashes += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, func, *args)
+    finally:
+        _pending_hashes -= 1
+
+async def verify_password_async(plain_password, hashed_password):
+    """Verify password on the hashing pool"""
+    return await run_password_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    """Hash password on the hashing pool"""
+    return await run_password_hashing(get_password_hash, password)
+
+class TokenRevocations:
+    """In-memory copy of the token revocation collection.
+
+    Holds revoked token ids plus a per-admin "tokens issued before" time and
+    reloads them from Mongo at most every ``refresh_interval`` seconds.
+    Revocations made by this process apply immediately.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._revoked_ids = set()
+        self._not_before = {}  # username -> datetime
+        self._refreshed_at = None
+        self._lock = None
+
+    async def refresh_if_stale(self):
+        """Reload the revocations if the local copy is older than the refresh interval"""
+        if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return
+            revocations = await Database.get_token_revocations()
+            # Keep the previous copy if Mongo is unavailable
+            if revocations is not None:
+                self._revoked_ids, self._not_before = revocations
+            self._refreshed_at = time.monotonic()
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Check a decoded token against the revoked ids and its admin's epoch"""
+        if payload.get("jti") in self._revoked_ids:
+            return True
+        not_before = self._not_before.get(payload.get("sub"))
+        if not_before is None:
+            return False
+        issued_at = datetime.utcfromtimestamp(payload.get("iat", 0))
+        # iat has whole-second precision, so a token from the same second is revoked too
+        return issued_at <= not_before
+
+    async def revoke_token(self, jti: str, expires_at: datetime):
+        self._revoked_ids.add(jti)
+        await Database.revoke_token(jti, expires_at)
+
+    async def revoke_admin(self, username: str):
+        now = datetime.utcnow()
+        self._not_before[username] = now
+        await Database.revoke_tokens_before(username, now)
+
+
+token_revocations = TokenRevocations(REVOCATION_REFRESH_SECONDS)
+
+class StreamTickets:
+    """Short-lived, single-use tickets that open an admin event stream.
+
+    EventSource can't send an Authorization header, so instead of putting the
+    access token in the URL (where it ends up in access logs and browser
+    history) the client trades it for a ticket that is only good once, for
+    ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float, max_tickets: int = 1000):
+        self.ttl = ttl
+        self.max_tickets = max_tickets
+        self._tickets = {}  # ticket -> (expires_at, admin), oldest first
+
+    def issue(self, admin: dict) -> str:
+        """Create a ticket for an authenticated admin"""
+        now = time.monotonic()
+        # Every ticket has the same lifetime, so insertion order is expiry order
+        while self._tickets and next(iter(self._tickets.values()))[0] <= now:
+            del self._tickets[next(iter(self._tickets))]
+        if len(self._tickets) >= self.max_tickets:
+            del self._tickets[next(iter(self._tickets))]
+        ticket = secrets.token_urlsafe(32)
+        self._tickets[ticket] = (now + self.ttl, dict(admin))
+        return ticket
+
+    def redeem(self, ticket: str):
+        """Use up a ticket; returns its admin, or None if unknown or expired"""
+        entry = self._tickets.pop(ticket, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+
+stream_tickets = StreamTickets(ttl=float(os.getenv("STREAM_TICKET_TTL_SECONDS", "30")))
+
+def token_claims(admin: dict) -> dict:
+    """Claims to embed in an admin's access token"""
+    claims = {"sub": admin["username"]}
+    if STATELESS_TOKENS:
+        claims.update(
+            name=admin.get("name"),
+            role=admin.get("role"),
+            profileImage=admin.get("profileImage"),
+        )
+    return claims
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current authenticated admin"""
+    return await get_admin_from_token(credentials.credentials)
+
+async def get_current_admin_from_ticket(ticket: str):
+    """Get the admin a ?ticket= query parameter was issued to (see StreamTickets).
+
+    Used by EventSource streams, which cannot send an Authorization header.
+    """
+    admin = stream_tickets.redeem(ticket)
+    if admin is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream ticket",
+        )
+    return admin
+
+async def get_admin_from_token(token: str):
+    """Validate a JWT and load the admin it belongs to"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,7 +208,6 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
     )
     
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
@@ -54,10 +215,28 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    
-    admin = await Database.get_admin_by_username(username=token_data.username)
-    if admin is None:
+
+    await token_revocations.refresh_if_stale()
+    if token_revocations.is_revoked(payload):
         raise credentials_exception
+
+    if STATELESS_TOKENS and "role" in payload:
+        admin = {
+            "username": token_data.username,
+            "name": payload.get("name"),
+            "role": payload.get("role"),
+            "profileImage": payload.get("profileImage"),
+        }
+    else:
+        # Cached briefly; create_admin and delete_admin invalidate the entry
+        admin = await principal_cache.get(
+            token_data.username, lambda: Database.get_admin_principal(token_data.username)
+        )
+        if admin is None:
+            raise credentials_exception
+        admin = dict(admin)
+    admin["tokenId"] = payload.get("jti")
+    admin["tokenExpiresAt"] = datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload else None
     return admin
 
 async def authenticate_admin(username: str, password: str):
@@ -65,6 +244,6 @@ async def authenticate_admin(username: str, password: str):
     admin = await Database.get_admin_by_username(username)
     if not admin:
         return False
-    if not verify_password(password, admin["password"]):
+    if not await verify_password_async(password, admin["password"]):
         return False
     return admin
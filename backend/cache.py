@@ -0,0 +1,213 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, responses fall back to gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class SectionCache:
+    """In-process read-through cache for public portfolio sections.
+
+    Every section has a version counter. Admin writes call ``invalidate`` which
+    bumps the version and drops the cached value, so the next public read goes
+    back to Mongo exactly once. Loaders raise on read errors; nothing is cached
+    then, so the next read retries instead of serving the failure.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._entries = {}  # section -> (version, value)
+        self._locks = {}
+        # Versions restart at 0 with the process, so ETags also carry a
+        # per-process epoch to stay unique across restarts.
+        self._epoch = secrets.token_hex(4)
+
+    def version(self, section: str) -> int:
+        """Current version of a section"""
+        return self._versions.get(section, 0)
+
+    def etag(self, *sections: str) -> str:
+        """Strong ETag for the current versions of one or more sections"""
+        key = ",".join(f"{s}:{self.version(s)}" for s in sorted(sections))
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return f'"{self._epoch}-{digest}"'
+
+    async def get(self, section: str, loader):
+        """Return the cached value for a section, loading it on a miss"""
+        entry = self._entries.get(section)
+        if entry is not None and entry[0] == self.version(section):
+            return entry[1]
+
+        # Only one coroutine per section goes to the database on a miss
+        lock = self._locks.setdefault(section, asyncio.Lock())
+        async with lock:
+            version = self.version(section)
+            entry = self._entries.get(section)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+            value = await loader()
+            # Don't cache missing sections, and don't store a value that was
+            # invalidated while we were loading it.
+            if value is not None and self.version(section) == version:
+                self._entries[section] = (version, value)
+            return value
+
+    def invalidate(self, section: str):
+        """Bump the section version and drop its cached value"""
+        self._versions[section] = self.version(section) + 1
+        self._entries.pop(section, None)
+        logger.debug(f"Section cache invalidated: {section} (v{self._versions[section]})")
+
+
+# Public JSON is recompressed after every admin write, so favour speed over the
+# last few percent of size
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Encodings every EncodedResponse carries, best first
+RESPONSE_CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str):
+    """Pick the best stored encoding the client accepts, or None for identity"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip())
+    for coding in RESPONSE_CODINGS:
+        if coding in accepted or "*" in accepted:
+            return coding
+    return None
+
+
+def representation_etag(etag: str, coding: str = None) -> str:
+    """ETag of one encoding of a response, suffixed like static_files does for its siblings"""
+    return etag if coding is None else f'{etag[:-1]}-{coding}"'
+
+
+class EncodedResponse:
+    """A JSON payload serialized once, with its compressed variants"""
+
+    def __init__(self, payload, etag: str):
+        self.etag = etag
+        # Same encoding FastAPI's JSONResponse uses
+        self.body = json.dumps(
+            jsonable_encoder(payload),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self.variants = {"gzip": gzip.compress(self.body, compresslevel=GZIP_LEVEL)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(self.body, quality=BROTLI_QUALITY)
+
+    def to_response(self, accept_encoding: str = "") -> Response:
+        """Build a raw-bytes response for the client's Accept-Encoding"""
+        coding = choose_encoding(accept_encoding)
+        headers = {
+            "ETag": representation_etag(self.etag, coding),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if coding is None:
+            return Response(content=self.body, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = coding
+        return Response(content=self.variants[coding], media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """Encoded public responses keyed by route, valid for a single ETag.
+
+    Encoding runs in a worker thread, and only once per key and ETag: requests
+    that miss at the same time wait for the first one's result.
+    """
+
+    def __init__(self):
+        self._entries = {}  # key -> EncodedResponse
+        self._locks = {}
+
+    def get(self, key: str, etag: str):
+        """Return the encoded response for a key if it matches the current ETag"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.etag == etag:
+            return entry
+        return None
+
+    async def put(self, key: str, etag: str, payload) -> EncodedResponse:
+        """Serialize and compress a payload off the event loop, replacing any older version of the key"""
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self.get(key, etag)
+            if entry is None:
+                entry = await asyncio.to_thread(EncodedResponse, payload, etag)
+                self._entries[key] = entry
+            return entry
+
+
+class TTLCache:
+    """Small read-through cache whose entries expire after ``ttl`` seconds.
+
+    ``invalidate`` drops an entry immediately; a load that was in flight when
+    the cache was invalidated is returned but not stored.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (expires_at, value), oldest first
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters and size"""
+        return {**self.stats, "entries": len(self._entries)}
+
+    async def get(self, key, loader):
+        """Return the cached value for a key, loading it on a miss or after expiry"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return entry[1]
+
+        self.stats["misses"] += 1
+        generation = self._generation
+        value = await loader()
+        if value is not None and self._generation == generation:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, key):
+        """Drop a key and discard any load currently in flight"""
+        self._entries.pop(key, None)
+        self._generation += 1
+
+
+section_cache = SectionCache()
+response_cache = ResponseCache()
+# Authenticated admins by username, without their password hash
+principal_cache = TTLCache(ttl=float(os.environ.get("ADMIN_PRINCIPAL_TTL", "30")))
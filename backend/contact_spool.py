@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+from bson import json_util
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the directory lock is skipped
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ContactSpool:
+    """Durable write-behind spool for contact-form submissions.
+
+    Submissions are appended as JSON lines to a local segment file and the
+    caller is released once the line is fsynced; appends that arrive while an
+    fsync is in flight share the next one (group commit). A drainer task
+    periodically seals the active segment and hands its entries to
+    ``on_drain``, deleting the segment only once that succeeds. Segments left
+    over from a previous run are replayed on start, so entries must carry
+    their own ``_id`` for the insert to be idempotent.
+
+    Only one process may own a spool directory; other workers that find it
+    locked don't start their spool and callers write directly instead.
+    """
+
+    def __init__(self, directory, on_drain, drain_interval: float = 1.0, max_retry_delay: float = 30.0):
+        self.directory = Path(directory)
+        self.on_drain = on_drain  # async (entries) -> bool
+        self.drain_interval = drain_interval
+        self.max_retry_delay = max_retry_delay
+        self._buffer = []  # (line, future) waiting for the next fsync
+        self._wakeup = None
+        self._stopping = None
+        self._file = None
+        self._segment = None
+        self._sequence = 0
+        self._io_lock = None
+        self._dir_lock = None
+        self._sync_task = None
+        self._drain_task = None
+        self.stats = {
+            "appended": 0,
+            "fsyncs": 0,
+            "drained": 0,
+            "drain_failures": 0,
+            "replayed_segments": 0,
+            "corrupt_lines": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._sync_task is not None and not self._sync_task.done()
+
+    def get_stats(self) -> dict:
+        """Spool throughput counters and backlog"""
+        return {**self.stats, "buffered": len(self._buffer), "sealed_segments": len(self._sealed_segments()),
+                "running": self.running}
+
+    def _segment_path(self, sequence: int) -> Path:
+        return self.directory / f"{sequence:012d}.jsonl"
+
+    def _sealed_segments(self) -> list:
+        if not self.directory.exists():
+            return []
+        return sorted(p for p in self.directory.glob("*.jsonl") if p != self._segment)
+
+    def _open_segment(self):
+        self._sequence += 1
+        self._segment = self._segment_path(self._sequence)
+        self._file = open(self._segment, "ab")
+
+    def start(self):
+        """Open a fresh segment and start the fsync and drain tasks (called from the app lifespan)"""
+        if self.running:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self._lock_directory():
+            logger.warning(f"Contact spool directory {self.directory} is in use by another process; not starting.")
+            return
+        leftovers = self._sealed_segments()
+        if leftovers:
+            self._sequence = int(leftovers[-1].stem)
+            self.stats["replayed_segments"] += len(leftovers)
+            logger.info(f"Contact spool replaying {len(leftovers)} segment(s) from a previous run.")
+        self._open_segment()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._io_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        self._sync_task = loop.create_task(self._sync_loop())
+        self._drain_task = loop.create_task(self._drain_loop())
+        logger.info("Contact spool started.")
+
+    async def stop(self):
+        """Fsync outstanding appends, make a last drain attempt and close the segment"""
+        if not self.running:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await asyncio.gather(self._drain_task, self._sync_task)
+        await self._sync_buffer()
+        await self._drain()
+        async with self._io_lock:
+            self._file.close()
+            if self._segment.stat().st_size == 0:
+                self._segment.unlink()
+        self._dir_lock.close()  # releases the flock
+        self._sync_task = self._drain_task = None
+        logger.info(f"Contact spool stopped, {self.stats['drained']} submissions drained.")
+
+    def _lock_directory(self) -> bool:
+        self._dir_lock = open(self.directory / ".lock", "w")
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._dir_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._dir_lock.close()
+            return False
+
+    async def append(self, entry: dict):
+        """Durably append an entry; returns once it has been fsynced"""
+        if not self.running:
+            raise RuntimeError("Contact spool is not running")
+        line = (json_util.dumps(entry) + "\n").encode("utf-8")
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((line, future))
+        self._wakeup.set()
+        await future
+        self.stats["appended"] += 1
+
+    def _write_lines(self, lines: list):
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def _sync_buffer(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            async with self._io_lock:
+                await asyncio.to_thread(self._write_lines, [line for line, _ in batch])
+            self.stats["fsyncs"] += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} entries to the contact spool: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _sync_loop(self):
+        while not self._stopping.is_set():
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Everything appended while the previous fsync ran goes out together
+            await self._sync_buffer()
+
+    async def _seal(self):
+        """Close the active segment if it has entries and start a new one"""
+        async with self._io_lock:
+            if self._file.tell() == 0:
+                return
+            await asyncio.to_thread(self._file.close)
+            self._open_segment()
+
+    @staticmethod
+    def _read_segment(path: Path):
+        entries, corrupt = [], 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    entries.append(json_util.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-write; it was never acknowledged
+                    corrupt += 1
+        return entries, corrupt
+
+    async def _drain(self) -> bool:
+        """Hand every sealed segment to ``on_drain``; returns False if one failed"""
+        await self._seal()
+        for path in self._sealed_segments():
+            entries, corrupt = await asyncio.to_thread(self._read_segment, path)
+            if corrupt:
+                self.stats["corrupt_lines"] += corrupt
+                logger.warning(f"Skipped {corrupt} unreadable line(s) in contact spool segment {path.name}")
+            try:
+                if entries and not await self.on_drain(entries):
+                    raise RuntimeError("drain callback reported failure")
+            except Exception as e:
+                self.stats["drain_failures"] += 1
+                logger.error(f"Error draining contact spool segment {path.name}: {e}")
+                return False
+            await asyncio.to_thread(path.unlink)
+            self.stats["drained"] += len(entries)
+        return True
+
+    async def _drain_loop(self):
+        delay = self.drain_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+                return  # stop() makes the final drain
+            except asyncio.TimeoutError:
+                pass
+            # Back off while the database is unavailable
+            delay = self.drain_interval if await self._drain() else min(delay * 2, self.max_retry_delay)
@@ -2,10 +2,17 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import re
 import logging
 import asyncio
-from pymongo import ASCENDING
+from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import BulkWriteError, ExecutionTimeout
 from bson import ObjectId
+from events import event_bus
+from cache import principal_cache
+from notification_writer import NotificationWriter
+from search_index import format_results, regex_matcher
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / ".env")
@@ -29,6 +36,62 @@ admin_collection = db.admin
 growth_mindset_collection = db.growth_mindset
 footer_collection = db.footer
 notifications_collection = db.notifications
+summary_collection = db.dashboard_summary
+notification_reads_collection = db.notification_reads
+token_revocations_collection = db.token_revocations
+image_variants_collection = db.image_variants
+
+# The dashboard summary is a single read-model document kept up to date by the
+# write paths below instead of being recomputed from full scans.
+SUMMARY_ID = "dashboard"
+RECENT_MESSAGES_LIMIT = 5
+SUMMARY_FIELDS = {"project_count", "message_count", "unread_message_count", "skill_category_count", "recent_messages"}
+# Characters of the message body included in inbox listings
+MESSAGE_PREVIEW_LENGTH = 140
+# Most documents a single bulk call may address by id
+MAX_BULK_IDS = 1000
+# Most notifications an admin may have read individually past their watermark
+MAX_READ_IDS = 1000
+
+# Server-side time budget for each admin search query
+SEARCH_MAX_TIME_MS = int(os.environ.get("SEARCH_MAX_TIME_MS", "500"))
+# Repeats of the same notification within this many seconds update one document
+NOTIFICATION_COALESCE_SECONDS = float(os.environ.get("NOTIFICATION_COALESCE_SECONDS", "300"))
+
+# Every index the queries below rely on, by collection. Database.create_indexes
+# applies it at startup; backend_explain.py checks the hot queries use it.
+INDEX_CATALOG = {
+    "notifications": [
+        # MongoDB deletes notifications 10 days (864000 seconds) after createdAt
+        IndexModel([("createdAt", ASCENDING)], expireAfterSeconds=864000),
+        # Keyset pagination of the feed, optionally filtered by type
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("type", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "contact_messages": [
+        # Keyset pagination of the inbox, optionally filtered by read state
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("read", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "token_revocations": [
+        # Revoked token ids only need to outlive the token itself
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+        IndexModel([("jti", ASCENDING)], unique=True, sparse=True),
+        IndexModel([("username", ASCENDING)], unique=True, sparse=True),
+    ],
+    "admin": [
+        IndexModel([("username", ASCENDING)], unique=True),
+    ],
+    "projects": [
+        IndexModel([("createdAt", DESCENDING)]),
+    ],
+    "learning_journey": [
+        IndexModel([("order", ASCENDING)]),
+    ],
+    "skills": [
+        IndexModel([("category", ASCENDING)]),
+    ],
+}
 
 logger = logging.getLogger(__name__)
 
@@ -36,28 +99,40 @@ logger = logging.getLogger(__name__)
 class Database:
     @staticmethod
     async def create_indexes():
-        """Creates database indexes on startup."""
-        try:
-            # This creates an index on the 'createdAt' field.
-            # MongoDB will automatically delete any document 30 days after its 'createdAt' time.
-            # 2592000 seconds = 30 days
-            await notifications_collection.create_index(
-                [("createdAt", ASCENDING)], 
-                expireAfterSeconds=864000
-            )
-            logger.info("TTL index for notifications created successfully.")
-        except Exception as e:
-            logger.error(f"Error creating TTL index: {e}")
+        """Applies INDEX_CATALOG on startup, one concurrent createIndexes per collection.
+
+        Creating an index that already exists with the same spec is a no-op, so
+        this is safe on every boot. A collection whose indexes can't be built
+        (e.g. duplicate usernames blocking the unique index) is logged and
+        doesn't stop the others.
+        """
+        names = list(INDEX_CATALOG)
+        results = await asyncio.gather(
+            *(db[name].create_indexes(INDEX_CATALOG[name]) for name in names),
+            return_exceptions=True,
+        )
+        failed = 0
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.error(f"Error creating indexes for {name}: {result}")
+        logger.info(f"Indexes applied for {len(names) - failed} of {len(names)} collections.")
+        return failed == 0
     
     @staticmethod
-    async def search_content(query: str):
-        """Search for a query across all major portfolio content."""
+    async def search_content(query: str, use_regex: bool = False):
+        """Search for a query across all major portfolio content.
+
+        The query is matched literally unless ``use_regex`` is set. Every Mongo
+        query carries a maxTimeMS budget; returns None if the search timed out.
+        """
         try:
-            search_regex = {"$regex": query, "$options": "i"}
+            pattern = query if use_regex else re.escape(query)
+            search_regex = {"$regex": pattern, "$options": "i"}
             
             profile_task = profile_collection.find_one({
                 "$or": [{"name": search_regex}, {"headline": search_regex}, {"bio": search_regex}, {"highlights": search_regex}, {"location": search_regex}, {"email": search_regex}, {"linkedin": search_regex}]
-            })
+            }, max_time_ms=SEARCH_MAX_TIME_MS)
             
             projects_task = projects_collection.find({
                 "$or": [
@@ -68,27 +143,27 @@ class Database:
                     {"liveUrl": search_regex},    # <-- ADDED
                     {"githubUrl": search_regex}  # <-- ADDED
                 ]
-            }).to_list(length=None)
+            }, max_time_ms=SEARCH_MAX_TIME_MS).to_list(length=None)
             
             skills_task = skills_collection.find({
                 "$or": [{"category": search_regex}, {"skills.name": search_regex}]
-            }).to_list(length=None)
+            }, max_time_ms=SEARCH_MAX_TIME_MS).to_list(length=None)
             
             education_task = education_collection.find_one({
             "$or": [{"degree": search_regex}, {"institution": search_regex}, {"year": search_regex}]
-            })
+            }, max_time_ms=SEARCH_MAX_TIME_MS)
             
             experience_task = experience_collection.find_one({
                 "$or": [{"main_title": search_regex}, {"main_message": search_regex}, {"goals.title": search_regex}, {"goals.description": search_regex}, {"cta_title": search_regex}, {"cta_message": search_regex}]
-            })
+            }, max_time_ms=SEARCH_MAX_TIME_MS)
             
             learning_journey_task = learning_journey_collection.find({
                 "$or": [{"phase": search_regex}, {"skills": search_regex}, {"status": search_regex}]
-            }).to_list(length=None)
+            }, max_time_ms=SEARCH_MAX_TIME_MS).to_list(length=None)
             
             growth_mindset_task = growth_mindset_collection.find_one({
             "$or": [{"title": search_regex}, {"quote": search_regex}]
-           })
+           }, max_time_ms=SEARCH_MAX_TIME_MS)
             
             experiments_task = experiments_collection.find_one({
                 "$or": [
@@ -98,7 +173,7 @@ class Database:
                     {"experiments.title": search_regex}, {"experiments.description": search_regex},
                     {"experiments.status": search_regex}
                 ]
-            })
+            }, max_time_ms=SEARCH_MAX_TIME_MS)
             
             contacts_task = contact_section_collection.find_one({
                 "$or": [
@@ -107,7 +182,7 @@ class Database:
                     {"get_in_touch_title": search_regex}, {"get_in_touch_description": search_regex},
                     {"contact_links.name": search_regex}, {"contact_links.value": search_regex}, {"contact_links.icon": search_regex},
                 ]
-            })
+            }, max_time_ms=SEARCH_MAX_TIME_MS)
             
             footer_task = footer_collection.find_one({
                 "$or": [
@@ -116,173 +191,129 @@ class Database:
                     {"connect_title": search_regex}, {"connect_description": search_regex},
                     {"bottom_text": search_regex}
                 ]
-            })
+            }, max_time_ms=SEARCH_MAX_TIME_MS)
 
             # Run all searches concurrently
             profile_match, projects_docs, skills_docs, education_match, experience_match, learning_journey_docs, growth_mindset_match, experiments_match, contact_section_match, footer_match = await asyncio.gather(
                 profile_task, projects_task, skills_task, education_task, experience_task, learning_journey_task, growth_mindset_task, experiments_task, contacts_task, footer_task
             )
             
-            # Process results
-            results = { "profile": [], "projects": [], "skills": [], "education": [], "experience": [], "learning_journey": [], "growth_mindset": [], "experiments": [], "contact": [], "footer": [] }
-            
-            # --- NEW: PROCESS FOOTER SECTION ---
-            if footer_match:
-                fields_to_check = ["brand_name", "brand_description", "connect_title", "connect_description", "bottom_text"]
-                for field in fields_to_check:
-                    value = footer_match.get(field)
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results["footer"].append({"field": field.replace('_', ' ').capitalize(), "value": value})
-                
-                for link in footer_match.get("quick_links", []):
-                    if query.lower() in link.get("name", "").lower() or query.lower() in link.get("href", "").lower():
-                        results["footer"].append({"field": f"Quick Link: {link.get('name')}", "value": link.get('href')})
-            
-            if contact_section_match:
-                fields_to_check = ["header_title", "header_description", "connect_title", "connect_description", "get_in_touch_title", "get_in_touch_description"]
-                for field in fields_to_check:
-                    value = contact_section_match.get(field)
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results["contact"].append({"field": field.replace('_', ' ').capitalize(), "value": value})
-                
-                for link in contact_section_match.get("contact_links", []):
-                    if query.lower() in link.get("name", "").lower() or query.lower() in link.get("value", "").lower() or query.lower() in link.get("icon", "").lower():
-                        results["contact"].append({"field": f"Contact Link: {link.get('name')}", "value": link.get('value'), "icon": link.get('icon')})
-
-            if experiments_match:
-                fields_to_check = ["header_title", "header_description", "lab_title", "lab_description"]
-                for field in fields_to_check:
-                    value = experiments_match.get(field)
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results["experiments"].append({"field": field.replace('_', ' ').capitalize(), "value": value})
-                
-                for feature in experiments_match.get("lab_features", []):
-                    if query.lower() in feature.get("title", "").lower() or query.lower() in feature.get("description", "").lower():
-                        results["experiments"].append({"field": f"Lab Feature: {feature.get('title')}", "value": feature.get('description')})
-                
-                for experiment in experiments_match.get("experiments", []):
-                    if query.lower() in experiment.get("title", "").lower() or query.lower() in experiment.get("description", "").lower() or query.lower() in experiment.get("status", "").lower():
-                        results["experiments"].append({"field": f"Experiment: {experiment.get('title')}", "value": experiment.get('description')})
-            
-            if profile_match:
-                fields_to_check = ["name", "headline", "bio", "highlights", "location", "email", "linkedin"]
-                for field in fields_to_check:
-                    value = profile_match.get(field)
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results["profile"].append({
-                            "field": field.replace('_', ' ').capitalize(), # e.g., "Resume url"
-                            "value": value
-                        })
-
-            if education_match:
-                fields_to_check = ["degree", "institution", "year"]
-                for field in fields_to_check:
-                    value = education_match.get(field)
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results["education"].append({
-                            "field": field.capitalize(),
-                            "value": value
-                        })
-
-            if experience_match:
-                fields_to_check = ["main_title",
-                                "main_message", "cta_title", "cta_message"]
-                for field in fields_to_check:
-                    value = experience_match.get(field)
-                    if isinstance(value, str) and query.lower() in value.lower():
-                        results["experience"].append({
-                            "field": field.replace('_', ' ').capitalize(),
-                            "value": value
-                        })
-                for goal in experience_match.get("goals", []):
-                    if query.lower() in goal.get("title", "").lower():
-                        results["experience"].append({
-                            "field": f"Goal: {goal.get('title')}",
-                            "value": goal.get('description')
-                        })
-                    elif query.lower() in goal.get("description", "").lower():
-                        results["experience"].append({
-                            "field": f"Goal: {goal.get('title')}",
-                            "value": goal.get('description')
-                        })
-
-            project_results = []
-            seen_projects = set()
-            for project in projects_docs:
-                project_id = str(project["_id"])
-                if project_id in seen_projects:
-                    continue
-                matches_in_project = []
-                if query.lower() in project.get("title", "").lower():
-                    matches_in_project.append("Match in title")
-                if query.lower() in project.get("description", "").lower():
-                    matches_in_project.append("Match in description")
-                if query.lower() in project.get("status", "").lower():
-                    matches_in_project.append(f"Match in status: '{project.get('status')}'")
-                for tech in project.get("technologies", []):
-                    if query.lower() in tech.lower():
-                        matches_in_project.append(f"Match in technology: '{tech}'")
-                if project.get("liveUrl") and query.lower() in project.get("liveUrl", "").lower():
-                    matches_in_project.append("Match in Live URL")
-                if project.get("githubUrl") and query.lower() in project.get("githubUrl", "").lower():
-                    matches_in_project.append("Match in GitHub URL")
-                if matches_in_project:
-                    project_results.append({
-                        "id": project_id,
-                        "title": project.get("title"),
-                        "matches": matches_in_project
-                    })
-                    seen_projects.add(project_id)
-            
-            results["projects"] = project_results
-                
-            skill_results = []
-            seen_skills = set() 
-            for s_doc in skills_docs:
-                category = s_doc.get("category", "Unknown")
-                if query.lower() in category.lower():
-                    category_match_id = f"category-{category}"
-                    if category_match_id not in seen_skills:
-                        skill_results.append({
-                            "type": "category",
-                            "name": category
-                        })
-                        seen_skills.add(category_match_id)
-                for skill in s_doc.get("skills", []):
-                    skill_name = skill.get("name")
-                    if skill_name and query.lower() in skill_name.lower():
-                        skill_match_id = f"skill-{skill_name}-{category}"
-                        if skill_match_id not in seen_skills:
-                            skill_results.append({
-                                "type": "skill",
-                                "name": skill_name,
-                                "proficiency": skill.get("proficiency"),
-                                "category": category
-                            })
-                            seen_skills.add(skill_match_id)
-            results["skills"] = skill_results
-            
-            if learning_journey_docs:
-                for phase in learning_journey_docs:
-                    results["learning_journey"].append({
-                        "field": f"Phase: {phase.get('phase')}",
-                        "value": f"Status: {phase.get('status')}. Skills: {', '.join(phase.get('skills', []))}"
-                    })
-
-            if growth_mindset_match:
-                if query.lower() in growth_mindset_match.get("title", "").lower():
-                    results["growth_mindset"].append({ "field": "Title", "value": growth_mindset_match.get("title") })
-                if query.lower() in growth_mindset_match.get("quote", "").lower():
-                    results["growth_mindset"].append({ "field": "Quote", "value": growth_mindset_match.get("quote") })
-                    
-            
-            
-            return results
+            return format_results(query, {
+                "profile": profile_match,
+                "projects": projects_docs,
+                "skills": skills_docs,
+                "education": education_match,
+                "experience": experience_match,
+                "learning_journey": learning_journey_docs,
+                "growth_mindset": growth_mindset_match,
+                "experiments": experiments_match,
+                "contact_section": contact_section_match,
+                "footer": footer_match,
+            }, match=regex_matcher(query, SEARCH_MAX_TIME_MS / 1000) if use_regex else None)
+        except (ExecutionTimeout, TimeoutError):
+            logger.warning(f"Search timed out after {SEARCH_MAX_TIME_MS}ms: {query!r}")
+            return None
         except Exception as e:
             logger.error(f"Error during content search: {e}")
             return {"profile": [], "projects": [], "skills": [], "education": [], "experience": []}
 
     
+    @staticmethod
+    async def _update_summary(update: dict):
+        """Apply an atomic update to the dashboard summary document.
+
+        An upsert here would create a summary holding only the updated fields,
+        so if the document is missing it is rebuilt from the source collections
+        instead (which already include the write being counted).
+        """
+        try:
+            result = await summary_collection.update_one({"_id": SUMMARY_ID}, update)
+            if result.matched_count == 0:
+                await Database.rebuild_dashboard_summary()
+            Database.push_summary()
+        except Exception as e:
+            logger.error(f"Error updating dashboard summary: {e}")
+
+    @staticmethod
+    def push_summary():
+        """Schedule a fresh summary for live admin event streams"""
+        event_bus.publish_later("summary", Database.get_dashboard_summary)
+
+    @staticmethod
+    async def _recent_unread_messages():
+        """Get the newest unread messages for the summary popover"""
+        cursor = (
+            contact_messages_collection.find({"read": False})
+            .sort("createdAt", DESCENDING)
+            .limit(RECENT_MESSAGES_LIMIT)
+        )
+        messages = []
+        async for message in cursor:
+            message["id"] = str(message["_id"])
+            del message["_id"]
+            messages.append(message)
+        return messages
+
+    @staticmethod
+    async def _refresh_recent_messages(message_id: str):
+        """Refill the recent unread list if a message in it was read or deleted"""
+        result = await summary_collection.update_one(
+            {"_id": SUMMARY_ID, "recent_messages.id": message_id},
+            {"$pull": {"recent_messages": {"id": message_id}}},
+        )
+        if result.modified_count:
+            await Database._update_summary(
+                {"$set": {"recent_messages": await Database._recent_unread_messages()}}
+            )
+
+    @staticmethod
+    async def rebuild_dashboard_summary():
+        """Recompute the dashboard summary from the source collections"""
+        try:
+            (
+                project_count,
+                message_count,
+                unread_message_count,
+                skill_category_count,
+                recent_messages,
+            ) = await asyncio.gather(
+                projects_collection.count_documents({}),
+                contact_messages_collection.count_documents({}),
+                contact_messages_collection.count_documents({"read": False}),
+                skills_collection.count_documents({}),
+                Database._recent_unread_messages(),
+            )
+            summary = {
+                "project_count": project_count,
+                "message_count": message_count,
+                "unread_message_count": unread_message_count,
+                "skill_category_count": skill_category_count,
+                "recent_messages": recent_messages,
+            }
+            await summary_collection.replace_one({"_id": SUMMARY_ID}, summary, upsert=True)
+            logger.info("Dashboard summary rebuilt successfully.")
+            return summary
+        except Exception as e:
+            logger.error(f"Error rebuilding dashboard summary: {e}")
+            return None
+
+    @staticmethod
+    async def get_dashboard_summary(username: str = None):
+        """Get the maintained dashboard summary, with the unread notification count for an admin"""
+        try:
+            summary = await summary_collection.find_one({"_id": SUMMARY_ID}, {"_id": 0})
+            # Rebuild a missing summary, or a partial one left by an older upserting write
+            if summary is None or not SUMMARY_FIELDS.issubset(summary):
+                summary = await Database.rebuild_dashboard_summary()
+                if summary is None:
+                    return None
+            if username is not None:
+                summary["unread_notification_count"] = await Database.get_unread_notification_count(username)
+            return summary
+        except Exception as e:
+            logger.error(f"Error getting dashboard summary: {e}")
+            return None
+
     @staticmethod
     async def get_profile():
         """Get profile data"""
@@ -291,11 +322,61 @@ class Database:
             if profile:
                 profile["id"] = str(profile["_id"])
                 del profile["_id"]
+                await Database._attach_image_variants([profile], "profileImage", "profileImageVariants")
             return profile
         except Exception as e:
             logger.error(f"Error getting profile: {e}")
+            raise
+
+    @staticmethod
+    async def _attach_image_variants(docs: list, field: str, target: str):
+        """Add the generated variants map for each document's image URL, where there is one"""
+        sources = {doc.get(field) for doc in docs if doc.get(field)}
+        if not sources:
+            return
+        try:
+            cursor = image_variants_collection.find({"_id": {"$in": list(sources)}})
+            variants = {doc.pop("_id"): doc async for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error getting image variants: {e}")
+            return
+        for doc in docs:
+            if doc.get(field) in variants:
+                doc[target] = variants[doc[field]]
+
+    @staticmethod
+    async def get_field_values(fields_by_collection: dict) -> list:
+        """Every stored value of the given fields, per collection; read errors are raised"""
+        try:
+            values = []
+            for name, fields in fields_by_collection.items():
+                async for doc in db[name].find({}, {field: 1 for field in fields}):
+                    values.extend(doc.get(field) for field in fields)
+            return values
+        except Exception as e:
+            logger.error(f"Error getting stored field values: {e}")
+            raise
+
+    @staticmethod
+    async def get_image_variants(source: str):
+        """Get the generated variants map for an image URL"""
+        try:
+            return await image_variants_collection.find_one({"_id": source}, {"_id": 0})
+        except Exception as e:
+            logger.error(f"Error getting image variants for {source}: {e}")
             return None
 
+    @staticmethod
+    async def save_image_variants(source: str, variants: dict):
+        """Store the generated variants map for an image URL"""
+        try:
+            variants["createdAt"] = datetime.utcnow()
+            await image_variants_collection.replace_one({"_id": source}, variants, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving image variants for {source}: {e}")
+            return False
+
     @staticmethod
     async def update_profile(profile_data: dict):
         """Update profile data"""
@@ -308,7 +389,7 @@ class Database:
 
     @staticmethod
     async def get_skills():
-        """Get all skills by category"""
+        """Get all skills by category; read errors are raised so an empty result isn't cached"""
         try:
             cursor = skills_collection.find()
             skills = {}
@@ -317,7 +398,7 @@ class Database:
             return skills
         except Exception as e:
             logger.error(f"Error getting skills: {e}")
-            return {}
+            raise
 
     @staticmethod
     async def update_skills(category: str, skills: list):
@@ -330,6 +411,8 @@ class Database:
                 {"$set": {"skills": skills, "category": category}},
                 upsert=True,
             )
+            if result.upserted_id is not None:
+                await Database._update_summary({"$inc": {"skill_category_count": 1}})
             return result.acknowledged
         except Exception as e:
             logger.error(f"Error updating skills: {e}")
@@ -340,6 +423,8 @@ class Database:
         """Delete a skill category"""
         try:
             result = await skills_collection.delete_one({"category": category})
+            if result.deleted_count:
+                await Database._update_summary({"$inc": {"skill_category_count": -1}})
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error deleting skills category {category}: {e}")
@@ -347,7 +432,7 @@ class Database:
 
     @staticmethod
     async def get_projects():
-        """Get all projects"""
+        """Get all projects; read errors are raised so an empty list isn't cached"""
         try:
             cursor = projects_collection.find().sort("createdAt", -1)
             projects = []
@@ -355,16 +440,18 @@ class Database:
                 project["id"] = str(project["_id"])
                 del project["_id"]
                 projects.append(project)
+            await Database._attach_image_variants(projects, "image", "imageVariants")
             return projects
         except Exception as e:
             logger.error(f"Error getting projects: {e}")
-            return []
+            raise
 
     @staticmethod
     async def create_project(project_data: dict):
         """Create new project"""
         try:
             result = await projects_collection.insert_one(project_data)
+            await Database._update_summary({"$inc": {"project_count": 1}})
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Error creating project: {e}")
@@ -391,6 +478,8 @@ class Database:
             from bson import ObjectId
 
             result = await projects_collection.delete_one({"_id": ObjectId(project_id)})
+            if result.deleted_count:
+                await Database._update_summary({"$inc": {"project_count": -1}})
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error deleting project: {e}")
@@ -407,7 +496,7 @@ class Database:
             return education
         except Exception as e:
             logger.error(f"Error getting education: {e}")
-            return None
+            raise
 
     @staticmethod
     async def update_education(education_data: dict):
@@ -432,7 +521,7 @@ class Database:
             return experience
         except Exception as e:
             logger.error(f"Error getting experience: {e}")
-            return None
+            raise
 
     @staticmethod
     async def update_experience(experience_data: dict):
@@ -457,7 +546,7 @@ class Database:
             return data
         except Exception as e:
             logger.error(f"Error getting growth mindset data: {e}")
-            return None
+            raise
 
     @staticmethod
     async def update_growth_mindset(data: dict):
@@ -471,7 +560,7 @@ class Database:
 
     @staticmethod
     async def get_learning_journey():
-        """Get learning journey timeline"""
+        """Get learning journey timeline; read errors are raised so an empty list isn't cached"""
         try:
             cursor = learning_journey_collection.find().sort("order", 1)
             journey = []
@@ -482,7 +571,7 @@ class Database:
             return journey
         except Exception as e:
             logger.error(f"Error getting learning journey: {e}")
-            return []
+            raise
 
     @staticmethod
     async def create_learning_phase(phase_data: dict):
@@ -533,7 +622,7 @@ class Database:
             return data
         except Exception as e:
             logger.error(f"Error getting experiments section: {e}")
-            return None
+            raise
 
     @staticmethod
     async def update_experiments_section(data: dict):
@@ -556,7 +645,7 @@ class Database:
             return data
         except Exception as e:
             logger.error(f"Error getting contact section: {e}")
-            return None
+            raise
 
     @staticmethod
     async def update_contact_section(data: dict):
@@ -573,16 +662,124 @@ class Database:
         """Create new contact message"""
         try:
             result = await contact_messages_collection.insert_one(message_data)
-            return str(result.inserted_id)
+            message_id = str(result.inserted_id)
+
+            update = {"$inc": {"message_count": 1}}
+            if not message_data.get("read", False):
+                recent = {k: v for k, v in message_data.items() if k != "_id"}
+                recent["id"] = message_id
+                update["$inc"]["unread_message_count"] = 1
+                update["$push"] = {
+                    "recent_messages": {
+                        "$each": [recent],
+                        "$position": 0,
+                        "$slice": RECENT_MESSAGES_LIMIT,
+                    }
+                }
+            await Database._update_summary(update)
+            return message_id
         except Exception as e:
             logger.error(f"Error creating contact message: {e}")
             return None
 
     @staticmethod
-    async def get_contact_messages():
-        """Get all contact messages"""
+    async def create_contact_messages(messages: list):
+        """Bulk-insert contact messages that carry their own ``_id``.
+
+        Messages already stored (e.g. replayed after a restart) are skipped.
+        Returns the newly inserted messages, or None if the write failed.
+        """
+        try:
+            try:
+                await contact_messages_collection.insert_many(messages, ordered=False)
+                inserted = messages
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                duplicates = {error["index"] for error in errors}
+                inserted = [m for i, m in enumerate(messages) if i not in duplicates]
+            if not inserted:
+                return []
+
+            unread = [m for m in inserted if not m.get("read", False)]
+            update = {"$inc": {"message_count": len(inserted), "unread_message_count": len(unread)}}
+            if unread:
+                recent = []
+                for message in sorted(unread, key=lambda m: m["createdAt"], reverse=True)[:RECENT_MESSAGES_LIMIT]:
+                    entry = {k: v for k, v in message.items() if k != "_id"}
+                    entry["id"] = str(message["_id"])
+                    recent.append(entry)
+                update["$push"] = {
+                    "recent_messages": {
+                        "$each": recent,
+                        "$position": 0,
+                        "$slice": RECENT_MESSAGES_LIMIT,
+                    }
+                }
+            await Database._update_summary(update)
+            return inserted
+        except Exception as e:
+            logger.error(f"Error creating {len(messages)} contact messages: {e}")
+            return None
+
+    @staticmethod
+    def _match_conditions(ids: list = None, since: datetime = None, until: datetime = None, **fields):
+        """Build ``$and`` conditions for an id list, a createdAt range and equality fields"""
+        conditions = []
+        if ids is not None:
+            conditions.append({"_id": {"$in": ids}})
+        conditions.extend({field: value} for field, value in fields.items() if value is not None)
+        created_at = {}
+        if since is not None:
+            created_at["$gte"] = since
+        if until is not None:
+            created_at["$lt"] = until
+        if created_at:
+            conditions.append({"createdAt": created_at})
+        return conditions
+
+    @staticmethod
+    def _keyset_condition(before: tuple):
+        """Condition for documents after a ``(createdAt, ObjectId)`` cursor, newest first"""
+        before_at, before_id = before
+        return {"$or": [
+            {"createdAt": {"$lt": before_at}},
+            {"createdAt": before_at, "_id": {"$lt": before_id}},
+        ]}
+
+    @staticmethod
+    def _contact_messages_pipeline(limit: int = 50, before: tuple = None, read: bool = None,
+                                   since: datetime = None, until: datetime = None):
+        """Aggregation for a page of inbox summaries (also checked by backend_explain.py)"""
+        conditions = Database._match_conditions(since=since, until=until, read=read)
+        if before is not None:
+            conditions.append(Database._keyset_condition(before))
+        return [
+            {"$match": {"$and": conditions} if conditions else {}},
+            {"$sort": {"createdAt": DESCENDING, "_id": DESCENDING}},
+            {"$limit": limit},
+            {"$project": {
+                "name": 1,
+                "email": 1,
+                "read": 1,
+                "createdAt": 1,
+                "preview": {"$substrCP": ["$message", 0, MESSAGE_PREVIEW_LENGTH]},
+            }},
+        ]
+
+    @staticmethod
+    async def get_contact_messages(limit: int = 50, before: tuple = None, read: bool = None,
+                                   since: datetime = None, until: datetime = None):
+        """Gets a page of contact message summaries, newest first.
+
+        Summaries carry a ``preview`` of the body instead of the full message;
+        ``before`` is a ``(createdAt, ObjectId)`` keyset cursor from a previous page.
+        """
         try:
-            cursor = contact_messages_collection.find().sort("createdAt", -1)
+            cursor = contact_messages_collection.aggregate(
+                Database._contact_messages_pipeline(limit, before, read, since, until)
+            )
             messages = []
             async for message in cursor:
                 message["id"] = str(message["_id"])
@@ -593,6 +790,19 @@ class Database:
             logger.error(f"Error getting contact messages: {e}")
             return []
 
+    @staticmethod
+    async def get_contact_message(message_id: str):
+        """Get a single contact message with its full body"""
+        try:
+            message = await contact_messages_collection.find_one({"_id": ObjectId(message_id)})
+            if message:
+                message["id"] = str(message["_id"])
+                del message["_id"]
+            return message
+        except Exception as e:
+            logger.error(f"Error getting contact message: {e}")
+            return None
+
     @staticmethod
     async def mark_message_read(message_id: str):
         """Mark message as read"""
@@ -602,6 +812,9 @@ class Database:
             result = await contact_messages_collection.update_one(
                 {"_id": ObjectId(message_id)}, {"$set": {"read": True}}
             )
+            if result.modified_count:
+                await Database._update_summary({"$inc": {"unread_message_count": -1}})
+                await Database._refresh_recent_messages(message_id)
             return result.acknowledged
         except Exception as e:
             logger.error(f"Error marking message as read: {e}")
@@ -613,14 +826,70 @@ class Database:
         try:
             from bson import ObjectId
 
-            result = await contact_messages_collection.delete_one(
-                {"_id": ObjectId(message_id)}
+            deleted = await contact_messages_collection.find_one_and_delete(
+                {"_id": ObjectId(message_id)}, projection={"read": 1}
             )
-            return result.deleted_count > 0
+            if deleted is None:
+                return False
+
+            update = {"$inc": {"message_count": -1}}
+            if not deleted.get("read", False):
+                update["$inc"]["unread_message_count"] = -1
+            await Database._update_summary(update)
+            await Database._refresh_recent_messages(message_id)
+            return True
         except Exception as e:
             logger.error(f"Error deleting contact message: {e}")
             return False
 
+    @staticmethod
+    def _bulk_messages_query(ids: list = None, since: datetime = None, until: datetime = None, read: bool = None):
+        """Filter for the messages a bulk call addresses, split by read state"""
+        return {"$and": Database._match_conditions(ids, since, until, read=read)}
+
+    @staticmethod
+    async def bulk_mark_messages_read(ids: list = None, since: datetime = None, until: datetime = None):
+        """Marks every matching unread message as read in one update; returns how many changed"""
+        try:
+            result = await contact_messages_collection.update_many(
+                Database._bulk_messages_query(ids, since, until, read=False), {"$set": {"read": True}}
+            )
+            if result.modified_count:
+                await Database._update_summary({
+                    "$inc": {"unread_message_count": -result.modified_count},
+                    "$set": {"recent_messages": await Database._recent_unread_messages()},
+                })
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"Error bulk marking messages as read: {e}")
+            return None
+
+    @staticmethod
+    async def bulk_delete_messages(ids: list = None, read: bool = None,
+                                   since: datetime = None, until: datetime = None):
+        """Deletes every matching message; returns how many were deleted"""
+        try:
+            # One delete per read state keeps the summary's unread counter exact
+            deleted = {}
+            for state in (False, True):
+                if read is not None and read != state:
+                    continue
+                result = await contact_messages_collection.delete_many(
+                    Database._bulk_messages_query(ids, since, until, read=state)
+                )
+                deleted[state] = result.deleted_count
+
+            total = sum(deleted.values())
+            if total:
+                await Database._update_summary({
+                    "$inc": {"message_count": -total, "unread_message_count": -deleted.get(False, 0)},
+                    "$set": {"recent_messages": await Database._recent_unread_messages()},
+                })
+            return total
+        except Exception as e:
+            logger.error(f"Error bulk deleting messages: {e}")
+            return None
+
     @staticmethod
     async def get_footer():
         """Get footer data"""
@@ -632,7 +901,7 @@ class Database:
             return data
         except Exception as e:
             logger.error(f"Error getting footer data: {e}")
-            return None
+            raise
 
     @staticmethod
     async def update_footer(data: dict):
@@ -645,58 +914,271 @@ class Database:
             return False
         
     @staticmethod
-    async def create_notification(notification_data: dict):
-        """Creates a new notification document"""
+    async def create_notification(notification_data: dict, coalesce: bool = True):
+        """Queues a new notification document for the background writer.
+
+        Messages are rendered with their actor and subject, so a repeat of the
+        same type and message (e.g. failed logins for one username, repeated
+        saves of one section) is counted on the earlier document instead, as
+        long as no admin has read that document yet. Repeats are published to
+        live subscribers with the id and running count of that document.
+        """
         try:
-            await notifications_collection.insert_one(notification_data)
+            # Assign the id up front so live subscribers see it before the batch is written
+            notification_data.setdefault("_id", ObjectId())
+            key = (notification_data.get("type"), notification_data.get("message")) if coalesce else None
+            notification_id, count = await notification_writer.enqueue(notification_data, key)
+            notification = {k: v for k, v in notification_data.items() if k != "_id"}
+            notification["id"] = str(notification_id)
+            notification["count"] = count
+            event_bus.publish("notification", notification)
             return True
         except Exception as e:
             logger.error(f"Error creating notification: {e}")
             return False
 
     @staticmethod
-    async def get_notifications(limit: int = 100):
-        """Gets the most recent notifications"""
-        cursor = notifications_collection.find().sort("createdAt", -1).limit(limit)
+    async def _get_read_state(username: str):
+        """Get an admin's read watermark and the ids read individually after it"""
+        state = await notification_reads_collection.find_one({"_id": username})
+        if state is None:
+            return None, []
+        return state.get("lastReadAt"), state.get("readIds", [])
+
+    @staticmethod
+    async def _live_read_ids(last_read_at, read_ids: list):
+        """The read ids still worth keeping: newer than the watermark and not yet expired"""
+        if not read_ids:
+            return []
+        query = {"_id": {"$in": read_ids}}
+        if last_read_at is not None:
+            query["createdAt"] = {"$gt": last_read_at}
+        return [doc["_id"] async for doc in notifications_collection.find(query, {"_id": 1})]
+
+    @staticmethod
+    def _unread_filter(last_read_at, read_ids: list):
+        """Query for notifications newer than the watermark that weren't read individually"""
+        query = {}
+        if last_read_at is not None:
+            query["createdAt"] = {"$gt": last_read_at}
+        if read_ids:
+            query["_id"] = {"$nin": read_ids}
+        return query
+
+    @staticmethod
+    async def get_unread_notification_count(username: str):
+        """Count an admin's unread notifications with a range count on createdAt"""
+        try:
+            last_read_at, read_ids = await Database._get_read_state(username)
+            return await notifications_collection.count_documents(
+                Database._unread_filter(last_read_at, read_ids)
+            )
+        except Exception as e:
+            logger.error(f"Error counting unread notifications for {username}: {e}")
+            return 0
+
+    @staticmethod
+    def _notifications_query(last_read_at, read_ids: list, before: tuple = None,
+                             notification_type: str = None, read: bool = None):
+        """Filter for a page of an admin's notification feed"""
+        conditions = []
+        if before is not None:
+            conditions.append(Database._keyset_condition(before))
+        if notification_type is not None:
+            conditions.append({"type": notification_type})
+        if read is False:
+            conditions.append(Database._unread_filter(last_read_at, read_ids))
+        elif read is True:
+            read_conditions = [{"_id": {"$in": read_ids}}]
+            if last_read_at is not None:
+                read_conditions.append({"createdAt": {"$lte": last_read_at}})
+            conditions.append({"$or": read_conditions})
+        return {"$and": conditions} if conditions else {}
+
+    @staticmethod
+    async def get_notifications(username: str, limit: int = 100, before: tuple = None,
+                                notification_type: str = None, read: bool = None, fields: list = None):
+        """Gets a page of notifications, newest first, with read state for the given admin.
+
+        ``before`` is a ``(createdAt, ObjectId)`` keyset cursor from a previous page;
+        ``fields`` limits the returned fields (``id``, ``createdAt`` and ``read`` are always included).
+        """
+        last_read_at, read_ids = await Database._get_read_state(username)
+        query = Database._notifications_query(last_read_at, read_ids, before, notification_type, read)
+
+        projection = None
+        if fields is not None:
+            projection = {field: 1 for field in fields}
+            projection["createdAt"] = 1
+
+        read_ids = set(read_ids)
+        cursor = (
+            notifications_collection.find(query, projection)
+            .sort([("createdAt", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit)
+        )
         notifications = []
         async for doc in cursor:
+            doc["read"] = (
+                (last_read_at is not None and doc["createdAt"] <= last_read_at)
+                or doc["_id"] in read_ids
+            )
             doc["id"] = str(doc["_id"])
             del doc["_id"]
             notifications.append(doc)
         return notifications
     
     @staticmethod
-    async def mark_notification_as_read(notification_id: str):
-        """Marks a single notification as read by its ID."""
+    async def mark_notification_as_read(notification_id: str, username: str):
+        """Marks a single notification as read for an admin."""
         try:
             # Convert the string ID to a MongoDB ObjectId
             obj_id = ObjectId(notification_id)
-            result = await notifications_collection.update_one(
-                {"_id": obj_id},
-                {"$set": {"read": True}}
+            notification = await notifications_collection.find_one({"_id": obj_id}, {"createdAt": 1})
+            if notification is None:
+                return False
+
+            last_read_at, read_ids = await Database._get_read_state(username)
+            if last_read_at is not None and notification["createdAt"] <= last_read_at:
+                return False  # already covered by the watermark
+
+            if len(read_ids) >= MAX_READ_IDS:
+                read_ids = await Database._live_read_ids(last_read_at, read_ids)
+                if len(read_ids) >= MAX_READ_IDS:
+                    logger.warning(f"Read list for {username} is full; mark notifications read in bulk instead")
+                    return False
+                await notification_reads_collection.update_one(
+                    {"_id": username}, {"$set": {"readIds": read_ids}}
+                )
+
+            result = await notification_reads_collection.update_one(
+                {"_id": username},
+                {"$addToSet": {"readIds": obj_id}},
+                upsert=True,
             )
-            return result.modified_count > 0
+            notification_writer.release([obj_id])
+            changed = result.modified_count > 0 or result.upserted_id is not None
+            if changed:
+                Database.push_summary()
+            return changed
         except Exception as e:
             logger.error(f"Error marking notification {notification_id} as read: {e}")
             return False
 
     
     @staticmethod
-    async def mark_notifications_as_read():
-        """Marks all unread notifications as read"""
-        # Change the filter from {"read": False} to {"read": {"$ne": True}}
-        # This finds documents where 'read' is false OR where the 'read' field doesn't exist at all.
-        await notifications_collection.update_many(
-            {"read": {"$ne": True}}, 
-            {"$set": {"read": True}}
-        )
-        return True
+    async def mark_notifications_as_read(username: str):
+        """Marks all notifications as read for an admin by moving their watermark"""
+        try:
+            # A single-document write no matter how many notifications are unread
+            await notification_reads_collection.update_one(
+                {"_id": username},
+                {"$set": {"lastReadAt": datetime.utcnow(), "readIds": []}},
+                upsert=True,
+            )
+            notification_writer.release()
+            Database.push_summary()
+            return True
+        except Exception as e:
+            logger.error(f"Error marking notifications as read for {username}: {e}")
+            return False
     
+    @staticmethod
+    def _bulk_notifications_query(ids: list = None, notification_type: str = None, since: datetime = None,
+                                  until: datetime = None, last_read_at=None, read_ids: list = None):
+        """Filter for the notifications a bulk call addresses; pass the read state to keep only unread ones"""
+        conditions = Database._match_conditions(ids, since, until, type=notification_type)
+        if read_ids is not None:
+            conditions.append(Database._unread_filter(last_read_at, read_ids))
+        return {"$and": conditions} if conditions else {}
+
+    @staticmethod
+    async def bulk_mark_notifications_read(username: str, ids: list = None, notification_type: str = None,
+                                           since: datetime = None, until: datetime = None):
+        """Marks matching unread notifications as read for an admin.
+
+        A filter that reaches back to the watermark moves the watermark up to the
+        newest match. Anything else is recorded in the admin's read ids, which
+        are pruned of expired entries and capped at MAX_READ_IDS. Returns
+        ``(count, truncated)``, where ``truncated`` means some matches were left
+        unread because of the cap, or None on error.
+        """
+        try:
+            if since is not None and since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)  # stored times are naive UTC
+            last_read_at, read_ids = await Database._get_read_state(username)
+            query = Database._bulk_notifications_query(ids, notification_type, since, until, last_read_at, read_ids)
+
+            reaches_watermark = ids is None and notification_type is None and (
+                since is None or (last_read_at is not None and since <= last_read_at)
+            )
+            if reaches_watermark:
+                # Every unread notification up to the newest match is covered
+                newest = await notifications_collection.find_one(
+                    query, {"createdAt": 1}, sort=[("createdAt", DESCENDING)]
+                )
+                if newest is None:
+                    return 0, False
+                count = await notifications_collection.count_documents(query)
+                watermark = newest["createdAt"]
+                await notification_reads_collection.update_one(
+                    {"_id": username},
+                    {"$set": {
+                        "lastReadAt": watermark,
+                        "readIds": await Database._live_read_ids(watermark, read_ids),
+                    }},
+                    upsert=True,
+                )
+                notification_writer.release()
+                Database.push_summary()
+                return count, False
+
+            read_ids = await Database._live_read_ids(last_read_at, read_ids)
+            room = max(0, min(MAX_BULK_IDS, MAX_READ_IDS - len(read_ids)))
+            # One extra match tells whether the cap left anything unread
+            cursor = notifications_collection.find(query, {"_id": 1}).limit(room + 1)
+            unread_ids = [doc["_id"] async for doc in cursor]
+            truncated = len(unread_ids) > room
+            unread_ids = unread_ids[:room]
+            if not unread_ids:
+                return 0, truncated
+
+            await notification_reads_collection.update_one(
+                {"_id": username},
+                {"$set": {"readIds": read_ids + unread_ids}},
+                upsert=True,
+            )
+            notification_writer.release(unread_ids)
+            Database.push_summary()
+            return len(unread_ids), truncated
+        except Exception as e:
+            logger.error(f"Error bulk marking notifications as read for {username}: {e}")
+            return None
+
+    @staticmethod
+    async def bulk_delete_notifications(ids: list = None, notification_type: str = None,
+                                        since: datetime = None, until: datetime = None):
+        """Deletes every matching notification; returns how many were deleted"""
+        try:
+            result = await notifications_collection.delete_many(
+                Database._bulk_notifications_query(ids, notification_type, since, until)
+            )
+            if result.deleted_count:
+                # Repeats would otherwise be counted on a deleted document and lost
+                notification_writer.release(ids)
+                Database.push_summary()
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"Error bulk deleting notifications: {e}")
+            return None
+
     @staticmethod
     async def delete_all_notifications():
         """Deletes all notifications from the collection."""
         try:
             await notifications_collection.delete_many({})
+            notification_writer.release()
+            Database.push_summary()
             return True
         except Exception as e:
             logger.error(f"Error deleting all notifications: {e}")
@@ -716,6 +1198,19 @@ class Database:
         except Exception as e:
             logger.error(f"Error getting admin: {e}")
             return None
+
+    @staticmethod
+    async def get_admin_principal(username: str):
+        """Get the admin an authenticated request acts as, without the password hash"""
+        try:
+            admin = await admin_collection.find_one({"username": username}, {"password": 0})
+            if admin:
+                admin["id"] = str(admin["_id"])
+                del admin["_id"]
+            return admin
+        except Exception as e:
+            logger.error(f"Error getting admin principal: {e}")
+            return None
         
     @staticmethod
     async def get_admins():
@@ -737,6 +1232,7 @@ class Database:
         """Create new admin"""
         try:
             result = await admin_collection.insert_one(admin_data)
+            principal_cache.invalidate(admin_data["username"])
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Error creating admin: {e}")
@@ -747,7 +1243,56 @@ class Database:
         """Deletes an admin by username"""
         try:
             result = await admin_collection.delete_one({"username": username})
+            principal_cache.invalidate(username)
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error deleting admin {username}: {e}")
             return False
+
+    @staticmethod
+    async def get_token_revocations():
+        """Get revoked token ids and each admin's tokens-issued-before time"""
+        try:
+            revoked_ids, not_before = set(), {}
+            async for doc in token_revocations_collection.find({}, {"_id": 0}):
+                if "jti" in doc:
+                    revoked_ids.add(doc["jti"])
+                elif "username" in doc:
+                    not_before[doc["username"]] = doc["notBefore"]
+            return revoked_ids, not_before
+        except Exception as e:
+            logger.error(f"Error getting token revocations: {e}")
+            return None
+
+    @staticmethod
+    async def revoke_token(jti: str, expires_at: datetime):
+        """Revoke a single token until it would have expired anyway"""
+        try:
+            await token_revocations_collection.update_one(
+                {"jti": jti}, {"$set": {"expiresAt": expires_at}}, upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error revoking token {jti}: {e}")
+            return False
+
+    @staticmethod
+    async def revoke_tokens_before(username: str, when: datetime):
+        """Revoke every token issued to an admin before ``when``"""
+        try:
+            await token_revocations_collection.update_one(
+                {"username": username}, {"$set": {"notBefore": when}}, upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error revoking tokens for {username}: {e}")
+            return False
+
+
+# Notifications are written in batches off the request path; the app lifespan
+# starts and drains it.
+notification_writer = NotificationWriter(
+    notifications_collection,
+    on_flush=Database.push_summary,
+    coalesce_window=NOTIFICATION_COALESCE_SECONDS,
+)
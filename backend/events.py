@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """In-process fan-out of admin events to live subscribers (e.g. SSE streams).
+
+    Each subscriber gets its own bounded queue; a slow subscriber drops events
+    instead of holding up the publisher.
+    """
+
+    def __init__(self, max_queue_size: int = 100, coalesce_delay: float = 0.25):
+        self._subscribers = set()
+        self._pending = {}  # event -> task for coalesced publishes
+        self.max_queue_size = max_queue_size
+        self.coalesce_delay = coalesce_delay
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a new subscriber and return its queue"""
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber"""
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, data):
+        """Send an event to every subscriber without waiting"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning(f"Dropping '{event}' event for a slow subscriber")
+
+    def publish_later(self, event: str, producer):
+        """Publish the result of ``producer()`` shortly, coalescing bursts of the same event.
+
+        Nothing is computed when there are no subscribers.
+        """
+        if not self._subscribers or event in self._pending:
+            return
+
+        async def run():
+            try:
+                await asyncio.sleep(self.coalesce_delay)
+                data = await producer()
+                if data is not None:
+                    self.publish(event, data)
+            except Exception as e:
+                logger.error(f"Error publishing '{event}' event: {e}")
+            finally:
+                self._pending.pop(event, None)
+
+        try:
+            self._pending[event] = asyncio.get_running_loop().create_task(run())
+        except RuntimeError:
+            # No running loop (e.g. called from a script); nobody to notify
+            pass
+
+
+event_bus = EventBus()
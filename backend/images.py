@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it images are served as uploaded
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 960, 1280)
+WEBP_QUALITY = 80
+PLACEHOLDER_WIDTH = 16
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", "2"))
+
+
+def _read_source(local_path: str) -> bytes:
+    with open(local_path, "rb") as f:
+        return f.read(MAX_SOURCE_BYTES + 1)
+
+
+def _encode_webp(image, width: int, quality: int) -> tuple:
+    resized = image.copy()
+    resized.thumbnail((width, width * 10), Image.LANCZOS)
+    buffer = BytesIO()
+    resized.save(buffer, "WEBP", quality=quality, method=4)
+    return resized.width, resized.height, buffer.getvalue()
+
+
+def render_variants(local_path: str) -> dict:
+    """Read an uploaded image and render its WebP widths and placeholder (runs in a worker process)"""
+    data = _read_source(local_path)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"Image larger than {MAX_SOURCE_BYTES} bytes")
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    # Never upscale; the largest variant is at most the original width
+    widths = [w for w in VARIANT_WIDTHS if w < image.width] + [min(image.width, VARIANT_WIDTHS[-1])]
+    variants = [_encode_webp(image, width, WEBP_QUALITY) for width in sorted(set(widths))]
+
+    _, _, tiny = _encode_webp(image, PLACEHOLDER_WIDTH, 30)
+    placeholder = "data:image/webp;base64," + base64.b64encode(tiny).decode("ascii")
+    return {"width": image.width, "height": image.height, "variants": variants, "placeholder": placeholder}
+
+
+class ImagePipeline:
+    """Generates resized WebP derivatives and an LQIP placeholder for image URLs.
+
+    Rendering runs on a process pool. Derivatives are stored content-addressed
+    in the BlobStore and the resulting variants map is saved with ``save``;
+    ``on_ready`` is called afterwards so cached API responses pick it up.
+    Each source is processed once, concurrent requests for it share the work.
+    Only our own uploads are processed: sources ``resolve_local`` can't map to
+    a file under /static are skipped, so a saved URL never makes the server
+    fetch from the network.
+    """
+
+    def __init__(self, store, resolve_local, load, save, on_ready=None, workers: int = IMAGE_WORKERS):
+        self.store = store
+        self.resolve_local = resolve_local  # url -> local file path for our own /static uploads, else None
+        self.load = load  # async (source) -> saved variants map or None
+        self.save = save  # async (source, variants map) -> bool
+        self.on_ready = on_ready
+        self.workers = workers
+        self._executor = None
+        self._inflight = {}  # source -> task
+        self.stats = {"processed": 0, "failed": 0, "skipped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None
+
+    def get_stats(self) -> dict:
+        """Throughput counters"""
+        return {**self.stats, "inflight": len(self._inflight), "enabled": self.enabled}
+
+    def schedule(self, *sources):
+        """Process image URLs in the background; unchanged or in-flight sources are skipped"""
+        if not self.enabled:
+            return
+        for source in sources:
+            if not source or source in self._inflight:
+                continue
+            local_path = self.resolve_local(source)
+            if local_path is None:
+                continue  # external or data: URL; served as saved
+            task = asyncio.get_running_loop().create_task(self._process(source, local_path))
+            self._inflight[source] = task
+            task.add_done_callback(lambda _, source=source: self._inflight.pop(source, None))
+
+    async def shutdown(self):
+        """Wait for in-flight work and stop the worker processes"""
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _process(self, source: str, local_path: str):
+        try:
+            if await self.load(source) is not None:
+                self.stats["skipped"] += 1
+                return
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                self._executor, render_variants, local_path
+            )
+
+            variants = []
+            for width, height, data in rendered["variants"]:
+                blob = await self.store.put_bytes(data, ".webp")
+                variants.append({"width": width, "height": height, "url": f"/static/{blob}", "type": "image/webp"})
+            await self.save(source, {
+                "width": rendered["width"],
+                "height": rendered["height"],
+                "variants": variants,
+                "srcset": ", ".join(f"{v['url']} {v['width']}w" for v in variants),
+                "placeholder": rendered["placeholder"],
+            })
+            self.stats["processed"] += 1
+            if self.on_ready:
+                self.on_ready(source)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Error generating image variants for {source}: {e}")
@@ -170,6 +170,22 @@ class ContactMessage(ContactMessageBase):
 class ContactMessageCreate(ContactMessageBase):
     pass
 
+# Bulk Operations
+class BulkAction(str, Enum):
+    READ = "read"
+    DELETE = "delete"
+
+class MessageBulkFilter(BaseModel):
+    read: Optional[bool] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+class MessageBulkRequest(BaseModel):
+    action: BulkAction
+    ids: Optional[List[str]] = None
+    filter: Optional[MessageBulkFilter] = None
+    all: bool = False  # explicit opt-in to address every document
+
 class FooterLink(BaseModel):
     name: str
     href: str
@@ -204,6 +220,19 @@ class NotificationBase(BaseModel):
 class Notification(NotificationBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     createdAt: datetime = Field(default_factory=datetime.utcnow)
+    count: int = 1  # occurrences merged into this notification
+    lastSeenAt: Optional[datetime] = None
+
+class NotificationBulkFilter(BaseModel):
+    type: Optional[NotificationType] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+class NotificationBulkRequest(BaseModel):
+    action: BulkAction
+    ids: Optional[List[str]] = None
+    filter: Optional[NotificationBulkFilter] = None
+    all: bool = False  # explicit opt-in to address every document
 
 # Admin Models
 class AdminBase(BaseModel):
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationWriter:
+    """Background batch writer for notification documents.
+
+    Handlers enqueue notifications into a bounded in-process queue and return
+    immediately; a flusher task writes them with ``bulk_write`` once a batch
+    fills up or the flush interval passes. When the queue is full, enqueueing
+    waits for room (backpressure) instead of dropping notifications.
+
+    Notifications enqueued with a coalescing key are merged with the first one
+    of the same key seen within ``coalesce_window`` seconds: that document's
+    ``count`` is incremented and its ``lastSeenAt`` moved forward instead of a
+    new document being written. Repeats that arrive before the next flush are
+    folded in memory, so a burst costs at most one update per flush. Marking a
+    notification read releases its window (see ``release``), so later repeats
+    open a new, unread document instead of landing on one already read.
+    """
+
+    def __init__(self, collection, batch_size: int = 50, flush_interval: float = 0.5,
+                 max_queue_size: int = 1000, max_retries: int = 3, on_flush=None,
+                 coalesce_window: float = 300, max_coalesce_keys: int = 10000):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.on_flush = on_flush
+        self.coalesce_window = coalesce_window
+        self.max_coalesce_keys = max_coalesce_keys
+        self._queue = None
+        self._task = None
+        self._pending = {}  # _id -> {"document", "count", "lastSeenAt"} not yet written
+        self._windows = OrderedDict()  # coalescing key -> [_id, expires_at, count], oldest first
+        self.stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "written": 0,
+            "batches": 0,
+            "failed": 0,
+            "backpressure_waits": 0,
+            "direct_writes": 0,
+            "max_depth": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def get_stats(self) -> dict:
+        """Queue depth and throughput counters"""
+        depth = self._queue.qsize() if self._queue is not None else 0
+        return {**self.stats, "depth": depth, "capacity": self.max_queue_size,
+                "coalescing_keys": len(self._windows), "running": self.running}
+
+    def start(self):
+        """Start the flusher task (called from the app lifespan)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Notification writer started.")
+
+    async def stop(self):
+        """Flush everything still queued and stop the flusher"""
+        if not self.running:
+            return
+        await self._queue.put(None)  # sentinel: drain and exit
+        await self._task
+        self._task = None
+        logger.info(f"Notification writer stopped, {self.stats['written']} notifications written.")
+
+    async def enqueue(self, document: dict, key=None) -> tuple:
+        """Queue a notification for writing; writes directly if the flusher isn't running.
+
+        The document must carry its ``_id``. Returns the ``(_id, count)`` it was
+        stored under: its own ``_id`` for a new document, or that of the earlier
+        notification with the same ``key`` it was merged into, with the count so far.
+        """
+        document.setdefault("createdAt", datetime.utcnow())
+        document.setdefault("count", 1)
+        document.setdefault("lastSeenAt", document["createdAt"])
+        if not self.running:
+            # e.g. scripts like seed_data.py that never start the app lifespan
+            await self.collection.insert_one(document)
+            self.stats["direct_writes"] += 1
+            return document["_id"], document["count"]
+
+        if key is not None:
+            now = asyncio.get_running_loop().time()
+            self._expire_windows(now)
+            window = self._windows.get(key)
+            if window is not None:
+                window[2] += document["count"]
+                await self._coalesce(window[0], document)
+                return window[0], window[2]
+            self._windows[key] = [document["_id"], now + self.coalesce_window, document["count"]]
+            if len(self._windows) > self.max_coalesce_keys:
+                self._windows.popitem(last=False)
+
+        self._pending[document["_id"]] = {
+            "document": document,
+            "count": document["count"],
+            "lastSeenAt": document["lastSeenAt"],
+        }
+        await self._put(document["_id"])
+        return document["_id"], document["count"]
+
+    def release(self, ids=None):
+        """Stop coalescing into the given notifications (every one when ``ids`` is None).
+
+        Called when notifications are read or deleted, so the next repeat opens
+        a new document that shows up as unread instead of being counted on one
+        the admin has already seen.
+        """
+        if ids is None:
+            self._windows.clear()
+            return
+        ids = set(ids)
+        for key in [key for key, window in self._windows.items() if window[0] in ids]:
+            del self._windows[key]
+
+    def _expire_windows(self, now: float):
+        # Every window has the same length, so insertion order is expiry order
+        while self._windows:
+            key, (_id, expires_at, _count) = next(iter(self._windows.items()))
+            if expires_at > now:
+                break
+            del self._windows[key]
+
+    async def _coalesce(self, _id, document: dict):
+        self.stats["coalesced"] += 1
+        pending = self._pending.get(_id)
+        if pending is not None:
+            # Still queued: fold into the pending write
+            pending["count"] += document["count"]
+            pending["lastSeenAt"] = max(pending["lastSeenAt"], document["lastSeenAt"])
+            return
+        # Already written: queue an increment for the stored document
+        self._pending[_id] = {"document": None, "count": document["count"], "lastSeenAt": document["lastSeenAt"]}
+        await self._put(_id)
+
+    async def _put(self, _id):
+        try:
+            self._queue.put_nowait(_id)
+        except asyncio.QueueFull:
+            self.stats["backpressure_waits"] += 1
+            await self._queue.put(_id)
+        self.stats["enqueued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            _id = await self._queue.get()
+            if _id is None:
+                break
+            batch = [_id]
+
+            # Collect more until the batch is full or the interval has passed
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    _id = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if _id is None:
+                    stopping = True
+                    break
+                batch.append(_id)
+
+            await self._flush(batch)
+
+    def _build_op(self, _id):
+        pending = self._pending.pop(_id)
+        if pending["document"] is not None:
+            return InsertOne({**pending["document"], "count": pending["count"], "lastSeenAt": pending["lastSeenAt"]})
+        return UpdateOne(
+            {"_id": _id},
+            {"$inc": {"count": pending["count"]}, "$max": {"lastSeenAt": pending["lastSeenAt"]}},
+        )
+
+    async def _flush(self, batch: list):
+        # Take the pending writes now; repeats arriving during the write are queued again
+        operations = [self._build_op(_id) for _id in batch]
+        written = 0
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+                written += len(operations)
+                operations = []
+                break
+            except BulkWriteError as e:
+                # Documents carry their own _id, so duplicates from an earlier
+                # partial attempt are already stored; only retry the rest.
+                errors = e.details.get("writeErrors", [])
+                retry = [operations[error["index"]] for error in errors if error.get("code") != 11000]
+                written += len(operations) - len(retry)
+                operations = retry
+                if not operations:
+                    break
+                logger.error(f"Error writing {len(operations)} notifications (attempt {attempt}): {e}")
+            except Exception as e:
+                logger.error(f"Error writing {len(operations)} notifications (attempt {attempt}): {e}")
+            await asyncio.sleep(0.1 * attempt)
+
+        self.stats["written"] += written
+        self.stats["batches"] += 1
+        self.stats["failed"] += len(operations)
+        if written and self.on_flush:
+            self.on_flush()
@@ -0,0 +1,90 @@
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Set RATE_LIMIT_ENABLED=false for load tests; counters are still kept
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+
+
+class RateLimiter:
+    """In-process token-bucket limiter keyed by client IP, username, etc.
+
+    Each key holds ``capacity`` tokens refilled at ``capacity / period`` per
+    second. Buckets are stored as ``[tokens, updated_at]`` pairs; buckets that
+    have refilled completely carry no state and are evicted periodically, and
+    the oldest buckets are dropped if the table grows past ``max_keys``.
+    """
+
+    def __init__(self, name: str, capacity: int, period: float, max_keys: int = 10000,
+                 eviction_interval: float = 60.0):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_keys = max_keys
+        self.eviction_interval = eviction_interval
+        self._buckets = {}  # key -> [tokens, updated_at], oldest first
+        self._next_eviction = time.monotonic() + eviction_interval
+        self.stats = {"allowed": 0, "limited": 0, "evicted": 0}
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters and table size"""
+        return {**self.stats, "keys": len(self._buckets)}
+
+    def hit(self, key: str) -> float:
+        """Take a token for ``key``; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        if now >= self._next_eviction:
+            self._evict(now)
+
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            bucket = [float(self.capacity), now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        # Re-insert so dict order stays least-recently-used first
+        self._buckets[key] = bucket
+        if len(self._buckets) > self.max_keys:
+            del self._buckets[next(iter(self._buckets))]
+            self.stats["evicted"] += 1
+
+        if bucket[0] >= 1 or not RATE_LIMIT_ENABLED:
+            bucket[0] = max(bucket[0] - 1, 0)
+            self.stats["allowed"] += 1
+            return 0
+        self.stats["limited"] += 1
+        return (1 - bucket[0]) / self.rate
+
+    def check(self, key: str) -> float:
+        """Like ``hit`` but without taking a token: 0 if one is available, else seconds to wait"""
+        bucket = self._buckets.get(key)
+        if bucket is None or not RATE_LIMIT_ENABLED:
+            return 0
+        tokens = min(self.capacity, bucket[0] + (time.monotonic() - bucket[1]) * self.rate)
+        if tokens >= 1:
+            return 0
+        self.stats["limited"] += 1
+        return (1 - tokens) / self.rate
+
+    def _evict(self, now: float):
+        # A bucket untouched for long enough to refill is the same as no bucket.
+        # Buckets are ordered by last use, so stop at the first recent one.
+        full_after = self.capacity / self.rate
+        while self._buckets:
+            key = next(iter(self._buckets))
+            if now - self._buckets[key][1] < full_after:
+                break
+            del self._buckets[key]
+            self.stats["evicted"] += 1
+        self._next_eviction = now + self.eviction_interval
+
+
+# Public form: a handful of messages per visitor
+contact_limiter = RateLimiter("contact_ip", capacity=5, period=600)
+# Login: per client, and failed attempts per targeted account from any client,
+# so a guess spread over many IPs still runs out; checked before any bcrypt work.
+# Successful logins aren't charged, which keeps lockout to repeated failures.
+login_ip_limiter = RateLimiter("login_ip", capacity=10, period=60)
+login_user_limiter = RateLimiter("login_username", capacity=10, period=300)
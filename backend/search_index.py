@@ -0,0 +1,371 @@
+import bisect
+import heapq
+import logging
+import re
+import time
+import regex
+from cache import section_cache
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Sections that hold a single document rather than a list
+SINGLETON_SECTIONS = {"profile", "education", "experience", "growth_mindset", "experiments", "contact_section", "footer"}
+
+# Ranking weight of each kind of typeahead suggestion, higher ranks first
+SUGGESTION_WEIGHTS = {"project": 5, "skill": 4, "category": 3, "technology": 3, "learning_phase": 2}
+SUGGESTION_SECTIONS = ("projects", "skills", "learning_journey")
+
+
+def empty_results():
+    return {"profile": [], "projects": [], "skills": [], "education": [], "experience": [], "learning_journey": [], "growth_mindset": [], "experiments": [], "contact": [], "footer": []}
+
+
+def literal_matcher(query: str):
+    """Case-insensitive substring matcher"""
+    q = query.lower()
+    return lambda text: q in text.lower()
+
+
+def regex_matcher(pattern: str, timeout: float):
+    """Case-insensitive regex matcher whose calls share a single ``timeout``-second budget.
+
+    Uses the ``regex`` module because the stdlib ``re`` can't be interrupted,
+    so a pathological pattern raises TimeoutError instead of pinning the event loop.
+    Each call only gets the time left before the deadline, so checking every
+    field of a search is bounded as a whole, not per field.
+    """
+    compiled = regex.compile(pattern, regex.IGNORECASE)
+    deadline = time.monotonic() + timeout
+
+    def match(text: str) -> bool:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Regex search ran out of time")
+        return compiled.search(text, timeout=remaining) is not None
+
+    return match
+
+
+def format_results(query: str, matches: dict, match=None):
+    """Turn the documents that matched a query into the admin search result shape.
+
+    ``matches`` maps section names to the matching document (singletons) or list of
+    documents. Every field is re-checked with ``match`` (a case-insensitive
+    substring test by default), so it is safe to pass a superset.
+    """
+    if match is None:
+        match = literal_matcher(query)
+    results = empty_results()
+
+    footer_match = matches.get("footer")
+    if footer_match:
+        fields_to_check = ["brand_name", "brand_description", "connect_title", "connect_description", "bottom_text"]
+        for field in fields_to_check:
+            value = footer_match.get(field)
+            if isinstance(value, str) and match(value):
+                results["footer"].append({"field": field.replace('_', ' ').capitalize(), "value": value})
+
+        for link in footer_match.get("quick_links", []):
+            if match(link.get("name", "")) or match(link.get("href", "")):
+                results["footer"].append({"field": f"Quick Link: {link.get('name')}", "value": link.get('href')})
+
+    contact_section_match = matches.get("contact_section")
+    if contact_section_match:
+        fields_to_check = ["header_title", "header_description", "connect_title", "connect_description", "get_in_touch_title", "get_in_touch_description"]
+        for field in fields_to_check:
+            value = contact_section_match.get(field)
+            if isinstance(value, str) and match(value):
+                results["contact"].append({"field": field.replace('_', ' ').capitalize(), "value": value})
+
+        for link in contact_section_match.get("contact_links", []):
+            if match(link.get("name", "")) or match(link.get("value", "")) or match(link.get("icon", "")):
+                results["contact"].append({"field": f"Contact Link: {link.get('name')}", "value": link.get('value'), "icon": link.get('icon')})
+
+    experiments_match = matches.get("experiments")
+    if experiments_match:
+        fields_to_check = ["header_title", "header_description", "lab_title", "lab_description"]
+        for field in fields_to_check:
+            value = experiments_match.get(field)
+            if isinstance(value, str) and match(value):
+                results["experiments"].append({"field": field.replace('_', ' ').capitalize(), "value": value})
+
+        for feature in experiments_match.get("lab_features", []):
+            if match(feature.get("title", "")) or match(feature.get("description", "")):
+                results["experiments"].append({"field": f"Lab Feature: {feature.get('title')}", "value": feature.get('description')})
+
+        for experiment in experiments_match.get("experiments", []):
+            if match(experiment.get("title", "")) or match(experiment.get("description", "")) or match(experiment.get("status", "")):
+                results["experiments"].append({"field": f"Experiment: {experiment.get('title')}", "value": experiment.get('description')})
+
+    profile_match = matches.get("profile")
+    if profile_match:
+        fields_to_check = ["name", "headline", "bio", "highlights", "location", "email", "linkedin"]
+        for field in fields_to_check:
+            value = profile_match.get(field)
+            if isinstance(value, str) and match(value):
+                results["profile"].append({
+                    "field": field.replace('_', ' ').capitalize(), # e.g., "Resume url"
+                    "value": value
+                })
+
+    education_match = matches.get("education")
+    if education_match:
+        fields_to_check = ["degree", "institution", "year"]
+        for field in fields_to_check:
+            value = education_match.get(field)
+            if isinstance(value, str) and match(value):
+                results["education"].append({
+                    "field": field.capitalize(),
+                    "value": value
+                })
+
+    experience_match = matches.get("experience")
+    if experience_match:
+        fields_to_check = ["main_title",
+                        "main_message", "cta_title", "cta_message"]
+        for field in fields_to_check:
+            value = experience_match.get(field)
+            if isinstance(value, str) and match(value):
+                results["experience"].append({
+                    "field": field.replace('_', ' ').capitalize(),
+                    "value": value
+                })
+        for goal in experience_match.get("goals", []):
+            if match(goal.get("title", "")) or match(goal.get("description", "")):
+                results["experience"].append({
+                    "field": f"Goal: {goal.get('title')}",
+                    "value": goal.get('description')
+                })
+
+    project_results = []
+    seen_projects = set()
+    for project in matches.get("projects") or []:
+        project_id = str(project.get("id", project.get("_id")))
+        if project_id in seen_projects:
+            continue
+        matches_in_project = []
+        if match(project.get("title", "")):
+            matches_in_project.append("Match in title")
+        if match(project.get("description", "")):
+            matches_in_project.append("Match in description")
+        if match(project.get("status", "")):
+            matches_in_project.append(f"Match in status: '{project.get('status')}'")
+        for tech in project.get("technologies", []):
+            if match(tech):
+                matches_in_project.append(f"Match in technology: '{tech}'")
+        if project.get("liveUrl") and match(project.get("liveUrl", "")):
+            matches_in_project.append("Match in Live URL")
+        if project.get("githubUrl") and match(project.get("githubUrl", "")):
+            matches_in_project.append("Match in GitHub URL")
+        if matches_in_project:
+            project_results.append({
+                "id": project_id,
+                "title": project.get("title"),
+                "matches": matches_in_project
+            })
+            seen_projects.add(project_id)
+    results["projects"] = project_results
+
+    skill_results = []
+    seen_skills = set()
+    for s_doc in matches.get("skills") or []:
+        category = s_doc.get("category", "Unknown")
+        if match(category):
+            category_match_id = f"category-{category}"
+            if category_match_id not in seen_skills:
+                skill_results.append({
+                    "type": "category",
+                    "name": category
+                })
+                seen_skills.add(category_match_id)
+        for skill in s_doc.get("skills", []):
+            skill_name = skill.get("name")
+            if skill_name and match(skill_name):
+                skill_match_id = f"skill-{skill_name}-{category}"
+                if skill_match_id not in seen_skills:
+                    skill_results.append({
+                        "type": "skill",
+                        "name": skill_name,
+                        "proficiency": skill.get("proficiency"),
+                        "category": category
+                    })
+                    seen_skills.add(skill_match_id)
+    results["skills"] = skill_results
+
+    for phase in matches.get("learning_journey") or []:
+        if (
+            match(phase.get("phase", ""))
+            or match(phase.get("status", ""))
+            or any(match(skill) for skill in phase.get("skills", []))
+        ):
+            results["learning_journey"].append({
+                "field": f"Phase: {phase.get('phase')}",
+                "value": f"Status: {phase.get('status')}. Skills: {', '.join(phase.get('skills', []))}"
+            })
+
+    growth_mindset_match = matches.get("growth_mindset")
+    if growth_mindset_match:
+        if match(growth_mindset_match.get("title", "")):
+            results["growth_mindset"].append({ "field": "Title", "value": growth_mindset_match.get("title") })
+        if match(growth_mindset_match.get("quote", "")):
+            results["growth_mindset"].append({ "field": "Quote", "value": growth_mindset_match.get("quote") })
+
+    return results
+
+
+def _strings(value):
+    """Yield every string nested inside a document"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _suggestion_values(section: str, docs: list):
+    """Yield (value, type) pairs a section contributes to typeahead"""
+    for doc in docs:
+        if section == "projects":
+            yield doc.get("title"), "project"
+            for tech in doc.get("technologies", []):
+                yield tech, "technology"
+        elif section == "skills":
+            yield doc.get("category"), "category"
+            for skill in doc.get("skills", []):
+                yield skill.get("name"), "skill"
+        elif section == "learning_journey":
+            yield doc.get("phase"), "learning_phase"
+
+
+class SearchIndex:
+    """Tokenized inverted index over the portfolio sections for admin search.
+
+    Each section is indexed from the section cache and re-indexed on its own
+    whenever its cache version changes, so admin writes only rebuild the
+    section they touched. Queries are still substring matches: the index only
+    narrows down candidate documents, then ``format_results`` does the exact
+    field checks.
+    """
+
+    def __init__(self, loaders: dict):
+        self._loaders = loaders
+        self._sections = {}  # section -> (version, docs, {term: {doc positions}})
+        # Typeahead: sorted lowercase keys with a parallel list of entries
+        self._suggest_versions = None
+        self._suggest_keys = []
+        self._suggest_entries = []
+
+    async def build(self):
+        """Index every section (called on startup)"""
+        started = time.perf_counter()
+        for section in self._loaders:
+            try:
+                await self._refresh(section)
+            except Exception as e:
+                # Left unindexed; the next search retries the load
+                logger.error(f"Error indexing {section}: {e}")
+        logger.info(f"Search index built in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    async def _refresh(self, section: str):
+        """Re-index a section if its cache version changed"""
+        version = section_cache.version(section)
+        current = self._sections.get(section)
+        if current is not None and current[0] == version:
+            return current
+
+        data = await self._loaders[section]()
+        if section in SINGLETON_SECTIONS:
+            docs = [data] if data else []
+        elif section == "skills":
+            docs = [{"category": category, "skills": skills} for category, skills in (data or {}).items()]
+        else:
+            docs = list(data or [])
+
+        postings = {}
+        for position, doc in enumerate(docs):
+            for text in _strings(doc):
+                for term in TOKEN_RE.findall(text.lower()):
+                    postings.setdefault(term, set()).add(position)
+
+        entry = (version, docs, postings)
+        # Like SectionCache, don't remember a missing section: data saved
+        # without an admin write (e.g. seeded after startup) must still show up
+        if data is not None:
+            self._sections[section] = entry
+        return entry
+
+    def _candidates(self, docs: list, postings: dict, tokens: list):
+        """Documents that contain every query token somewhere inside one of their terms"""
+        if not tokens:
+            # Query has no word characters (e.g. "@"), nothing to narrow by
+            return docs
+        positions = None
+        for token in tokens:
+            found = set()
+            for term, term_positions in postings.items():
+                if token in term:
+                    found |= term_positions
+            positions = found if positions is None else positions & found
+            if not positions:
+                return []
+        return [docs[p] for p in sorted(positions)]
+
+    async def search(self, query: str):
+        """Search every section, returning the same shape as Database.search_content"""
+        tokens = TOKEN_RE.findall(query.lower())
+        matches = {}
+        for section in self._loaders:
+            _, docs, postings = await self._refresh(section)
+            candidates = self._candidates(docs, postings, tokens)
+            if section in SINGLETON_SECTIONS:
+                matches[section] = candidates[0] if candidates else None
+            else:
+                matches[section] = candidates
+        return format_results(query, matches)
+
+    def _build_suggestions(self, entries: list):
+        """Rebuild the sorted typeahead term array from the suggestion sections' index entries"""
+        seen = set()
+        terms = []
+        for section, (_, docs, _) in zip(SUGGESTION_SECTIONS, entries):
+            for value, kind in _suggestion_values(section, docs):
+                if not value or (value, kind) in seen:
+                    continue
+                seen.add((value, kind))
+                lowered = value.lower()
+                # Index the value under every word start so "cloud" finds "AWS Cloud"
+                for match in TOKEN_RE.finditer(lowered):
+                    whole = 0 if match.start() == 0 else 1
+                    terms.append((lowered[match.start():], whole, value, kind))
+        terms.sort()
+        self._suggest_keys = [term[0] for term in terms]
+        self._suggest_entries = [term[1:] for term in terms]
+
+    async def suggest(self, prefix: str, limit: int = 8):
+        """Top completions for a prefix, ranked by field weight"""
+        entries = [await self._refresh(section) for section in SUGGESTION_SECTIONS]
+        versions = tuple(entry[0] for entry in entries)
+        if versions != self._suggest_versions:
+            self._build_suggestions(entries)
+            self._suggest_versions = versions
+
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+
+        best = {}
+        position = bisect.bisect_left(self._suggest_keys, prefix)
+        while position < len(self._suggest_keys) and self._suggest_keys[position].startswith(prefix):
+            whole, value, kind = self._suggest_entries[position]
+            rank = (-SUGGESTION_WEIGHTS[kind], whole, len(value), value.lower())
+            if (value, kind) not in best or rank < best[(value, kind)]:
+                best[(value, kind)] = rank
+            position += 1
+
+        top = heapq.nsmallest(limit, best.items(), key=lambda item: item[1])
+        return [{"value": value, "type": kind} for (value, kind), _ in top]
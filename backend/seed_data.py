@@ -289,6 +289,9 @@ async def seed_database():
         "createdAt": datetime.utcnow()
     }
     await Database.create_admin(admin_data)
+
+    # Projects were cleared directly, so recompute the dashboard counters
+    await Database.rebuild_dashboard_summary()
     
     print("✅ Database seeded successfully!")
 
@@ -1,11 +1,16 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, Request, Response
 from fastapi import File, UploadFile
-import shutil
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 import os
+import json
+import time
+import math
+import asyncio
+import regex
 import logging
 from pathlib import Path
 from datetime import timedelta
@@ -14,8 +19,16 @@ from contextlib import asynccontextmanager
 
 # Import our models and database
 from models import *
-from database import Database, notifications_collection
-from auth import authenticate_admin, create_access_token, get_current_admin, get_password_hash
+from database import Database, notification_writer, MAX_BULK_IDS
+from bson import ObjectId
+from cache import choose_encoding, representation_etag, section_cache, response_cache, principal_cache
+from events import event_bus
+from contact_spool import ContactSpool
+from rate_limit import contact_limiter, login_ip_limiter, login_user_limiter
+from storage import UploadTooLarge, BlobStore, BlobStaticFiles, UploadLimitMiddleware
+from images import ImagePipeline
+from search_index import SearchIndex
+from auth import authenticate_admin, create_access_token, get_current_admin, get_current_admin_from_ticket, get_password_hash_async, stream_tickets, token_claims, token_revocations
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -26,9 +39,24 @@ async def lifespan(app: FastAPI):
     # Code here runs on startup
     print("--- Running startup tasks ---")
     await Database.create_indexes()
+    await Database.rebuild_dashboard_summary()
+    await search_index.build()
+    await blob_store.collect_garbage()
+    notification_writer.start()
+    contact_spool.start()
+    # Backfill variants for images saved before the pipeline existed
+    try:
+        profile, projects = await asyncio.gather(Database.get_profile(), Database.get_projects())
+        image_pipeline.schedule((profile or {}).get("profileImage"), *(p.get("image") for p in projects))
+    except Exception as e:
+        logger.error(f"Error scheduling image variant backfill: {e}")
     yield
-    # Code here runs on shutdown (not needed for this)
+    # Code here runs on shutdown
     print("--- Running shutdown tasks ---")
+    # The spool's final drain still writes notifications, so stop it first
+    await contact_spool.stop()
+    await image_pipeline.shutdown()
+    await notification_writer.stop()
 
 # Pass the lifespan function to your FastAPI app instance
 app = FastAPI(title="Shreeya Portfolio API", version="1.0.0", lifespan=lifespan)
@@ -36,8 +64,62 @@ app = FastAPI(title="Shreeya Portfolio API", version="1.0.0", lifespan=lifespan)
 UPLOAD_DIR = ROOT_DIR / "static"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Every stored field that can hold an upload URL, by collection. Garbage
+# collection deletes orphaned blobs that none of these point at, so a field
+# that takes /static URLs (from an upload form or /admin/upload-image) must be
+# listed here.
+UPLOAD_URL_FIELDS = {
+    "profile": ("profileImage", "resume_url"),
+    "projects": ("image",),
+    "admin": ("profileImage",),
+}
+
+async def static_references():
+    """Blob paths referenced by saved content, or None if they can't be read.
+
+    Every read has to succeed: a partial set would make blobs the missing
+    documents point at look orphaned, and garbage collection would delete them.
+    """
+    try:
+        urls = await Database.get_field_values(UPLOAD_URL_FIELDS)
+    except Exception as e:
+        logger.warning(f"Blob references unavailable: {e}")
+        return None
+    return {
+        "blobs/" + url.split("/static/blobs/", 1)[1]
+        for url in urls
+        if isinstance(url, str) and "/static/blobs/" in url
+    }
+
+# Uploads are stored under their content hash; logical names resolve through a manifest
+blob_store = BlobStore(UPLOAD_DIR, references=static_references)
+
+def local_static_path(url: str):
+    """Local file behind one of our own /static URLs, or None for anything else"""
+    if not url.startswith("/static/"):
+        return None
+    name = url[len("/static/"):]
+    path = (UPLOAD_DIR / (blob_store.resolve(name) or name)).resolve()
+    if UPLOAD_DIR.resolve() not in path.parents or not path.is_file():
+        return None
+    return str(path)
+
+def image_variants_ready(source: str):
+    """Drop cached API responses so new variants maps are served"""
+    section_cache.invalidate("profile")
+    section_cache.invalidate("projects")
+
+# Resized WebP derivatives and placeholders for profile and project images
+image_pipeline = ImagePipeline(
+    blob_store,
+    resolve_local=local_static_path,
+    load=Database.get_image_variants,
+    save=Database.save_image_variants,
+    on_ready=image_variants_ready,
+)
+
 # Mount the static directory to serve files from /static URL
-app.mount("/static", StaticFiles(directory=UPLOAD_DIR), name="static")
+app.mount("/static", BlobStaticFiles(directory=UPLOAD_DIR, store=blob_store), name="static")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -57,120 +139,290 @@ logger = logging.getLogger(__name__)
 async def root():
     return {"message": "Portfolio API is running", "status": "success"}
 
+# Loaders for every public section, keyed by the name used in the /portfolio bundle.
+# They raise on read errors; None only means a singleton section doesn't exist yet.
+PORTFOLIO_SECTIONS = {
+    "profile": lambda: section_cache.get("profile", Database.get_profile),
+    "skills": lambda: section_cache.get("skills", Database.get_skills),
+    "projects": lambda: section_cache.get("projects", Database.get_projects),
+    "education": lambda: section_cache.get("education", Database.get_education),
+    "experience": lambda: section_cache.get("experience", Database.get_experience),
+    "learning_journey": lambda: section_cache.get("learning_journey", Database.get_learning_journey),
+    "growth_mindset": lambda: section_cache.get("growth_mindset", Database.get_growth_mindset),
+    "experiments": lambda: section_cache.get("experiments", Database.get_experiments_section),
+    "contact_section": lambda: section_cache.get("contact_section", Database.get_contact_section),
+    "footer": lambda: section_cache.get("footer", Database.get_footer),
+}
+
+# Admin search is answered from memory, re-indexing a section when its cache version changes
+search_index = SearchIndex(PORTFOLIO_SECTIONS)
+
+def cached_response(request: Request, key: str, etag: str):
+    """Return a 304 or the pre-encoded response for a route if its ETag is still current"""
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Each encoding has its own ETag; compare against the one this client would get.
+        # If-None-Match uses weak comparison, so ignore any W/ prefix
+        current = representation_etag(etag, choose_encoding(accept_encoding))
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if current in candidates or "*" in candidates:
+            return Response(
+                status_code=304,
+                headers={"ETag": current, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"},
+            )
+
+    encoded = response_cache.get(key, etag)
+    if encoded is not None:
+        return encoded.to_response(accept_encoding)
+    return None
+
+async def encoded_response(request: Request, key: str, etag: str, payload: dict):
+    """Serialize and compress a payload once for this ETag, then serve it"""
+    encoded = await response_cache.put(key, etag, payload)
+    return encoded.to_response(request.headers.get("accept-encoding", ""))
+
+def client_ip(request: Request) -> str:
+    """Address of the client, taken from X-Forwarded-For when the request came through a trusted proxy"""
+    return request.client.host if request.client else "unknown"
+
+def enforce_rate_limit(limiter, key: str, charge: bool = True):
+    """Reject the request with 429 if ``key`` is over the limiter's budget.
+
+    With ``charge=False`` the budget is only checked; the caller charges it
+    later (e.g. only for failed logins).
+    """
+    retry_after = limiter.hit(key) if charge else limiter.check(key)
+    if retry_after:
+        logger.warning(f"Rate limit '{limiter.name}' exceeded for {key}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+SSE_KEEPALIVE_SECONDS = 15
+
+def format_sse(event: str, data) -> str:
+    """Format a Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+# Portfolio Bundle Route
+@api_router.get("/portfolio")
+async def get_portfolio(request: Request, sections: Optional[str] = None):
+    """Get every public section (or a comma-separated subset) in one response"""
+    if sections:
+        names = {s.strip() for s in sections.split(",") if s.strip()}
+        unknown = sorted(names - PORTFOLIO_SECTIONS.keys())
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+        # Canonical order keeps the number of distinct cached bundles bounded
+        requested = [s for s in PORTFOLIO_SECTIONS if s in names]
+    else:
+        requested = list(PORTFOLIO_SECTIONS)
+
+    key = "portfolio:" + ",".join(requested)
+    etag = section_cache.etag(*requested)
+    cached = cached_response(request, key, etag)
+    if cached:
+        return cached
+
+    try:
+        # Fetch all sections concurrently. A section that fails to load raises,
+        # so a bundle with a missing piece is never encoded under this ETag.
+        results = await asyncio.gather(*(PORTFOLIO_SECTIONS[s]() for s in requested))
+        return await encoded_response(request, key, etag, {"success": True, "data": dict(zip(requested, results))})
+    except Exception as e:
+        logger.error(f"Error getting portfolio bundle: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # Profile Routes
 @api_router.get("/profile")
-async def get_profile():
+async def get_profile(request: Request):
     """Get profile data"""
+    etag = section_cache.etag("profile")
+    cached = cached_response(request, "profile", etag)
+    if cached:
+        return cached
     try:
-        profile = await Database.get_profile()
+        profile = await section_cache.get("profile", Database.get_profile)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
-        return {"success": True, "data": profile}
+        return await encoded_response(request, "profile", etag, {"success": True, "data": profile})
     except Exception as e:
         logger.error(f"Error getting profile: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Skills Routes
 @api_router.get("/skills")
-async def get_skills():
+async def get_skills(request: Request):
     """Get all skills by category"""
+    etag = section_cache.etag("skills")
+    cached = cached_response(request, "skills", etag)
+    if cached:
+        return cached
     try:
-        skills = await Database.get_skills()
-        return {"success": True, "data": skills}
+        skills = await section_cache.get("skills", Database.get_skills)
+        return await encoded_response(request, "skills", etag, {"success": True, "data": skills})
     except Exception as e:
         logger.error(f"Error getting skills: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Projects Routes
 @api_router.get("/projects")
-async def get_projects():
+async def get_projects(request: Request):
     """Get all projects"""
+    etag = section_cache.etag("projects")
+    cached = cached_response(request, "projects", etag)
+    if cached:
+        return cached
     try:
-        projects = await Database.get_projects()
-        return {"success": True, "data": projects, "total": len(projects)}
+        projects = await section_cache.get("projects", Database.get_projects)
+        return await encoded_response(request, "projects", etag, {"success": True, "data": projects, "total": len(projects)})
     except Exception as e:
         logger.error(f"Error getting projects: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Education Routes
 @api_router.get("/education")
-async def get_education():
+async def get_education(request: Request):
     """Get education data"""
+    etag = section_cache.etag("education")
+    cached = cached_response(request, "education", etag)
+    if cached:
+        return cached
     try:
-        education = await Database.get_education()
+        education = await section_cache.get("education", Database.get_education)
         if not education:
             raise HTTPException(status_code=404, detail="Education data not found")
-        return {"success": True, "data": education}
+        return await encoded_response(request, "education", etag, {"success": True, "data": education})
     except Exception as e:
         logger.error(f"Error getting education: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Experience Routes
 @api_router.get("/experience")
-async def get_experience():
+async def get_experience(request: Request):
     """Get experience data"""
+    etag = section_cache.etag("experience")
+    cached = cached_response(request, "experience", etag)
+    if cached:
+        return cached
     try:
-        experience = await Database.get_experience()
+        experience = await section_cache.get("experience", Database.get_experience)
         if not experience:
             raise HTTPException(status_code=404, detail="Experience data not found")
-        return {"success": True, "data": experience}
+        return await encoded_response(request, "experience", etag, {"success": True, "data": experience})
     except Exception as e:
         logger.error(f"Error getting experience: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Learning Journey Routes
 @api_router.get("/learning-journey")
-async def get_learning_journey():
+async def get_learning_journey(request: Request):
     """Get learning journey timeline"""
+    etag = section_cache.etag("learning_journey")
+    cached = cached_response(request, "learning_journey", etag)
+    if cached:
+        return cached
     try:
-        journey = await Database.get_learning_journey()
+        journey = await section_cache.get("learning_journey", Database.get_learning_journey)
         print("--- JOURNEY DATA FROM DB:", journey)
-        return {"success": True, "data": journey, "total": len(journey)}
+        return await encoded_response(request, "learning_journey", etag, {"success": True, "data": journey, "total": len(journey)})
     except Exception as e:
         logger.error(f"Error getting learning journey: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     
 @api_router.get("/growth-mindset")
-async def get_growth_mindset():
+async def get_growth_mindset(request: Request):
     """Get growth mindset data"""
+    etag = section_cache.etag("growth_mindset")
+    cached = cached_response(request, "growth_mindset", etag)
+    if cached:
+        return cached
     try:
-        data = await Database.get_growth_mindset()
+        data = await section_cache.get("growth_mindset", Database.get_growth_mindset)
         if not data:
             raise HTTPException(status_code=404, detail="Data not found")
-        return {"success": True, "data": data}
+        return await encoded_response(request, "growth_mindset", etag, {"success": True, "data": data})
     except Exception as e:
         logger.error(f"Error getting growth mindset data: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Experiments Routes
 @api_router.get("/experiments")
-async def get_experiments_section():
+async def get_experiments_section(request: Request):
     """Get the entire experiments section data"""
+    etag = section_cache.etag("experiments")
+    cached = cached_response(request, "experiments", etag)
+    if cached:
+        return cached
     try:
-        data = await Database.get_experiments_section()
+        data = await section_cache.get("experiments", Database.get_experiments_section)
         if not data:
             raise HTTPException(status_code=404, detail="Experiments section not found")
-        return {"success": True, "data": data}
+        return await encoded_response(request, "experiments", etag, {"success": True, "data": data})
     except Exception as e:
         logger.error(f"Error getting experiments section: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     
 @api_router.get("/contact-section")
-async def get_contact_section():
+async def get_contact_section(request: Request):
     """Get contact section data"""
-    data = await Database.get_contact_section()
+    etag = section_cache.etag("contact_section")
+    cached = cached_response(request, "contact_section", etag)
+    if cached:
+        return cached
+    try:
+        data = await section_cache.get("contact_section", Database.get_contact_section)
+    except Exception as e:
+        logger.error(f"Error getting contact section: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
     if not data:
         raise HTTPException(status_code=404, detail="Contact section data not found")
-    return {"success": True, "data": data}
+    return await encoded_response(request, "contact_section", etag, {"success": True, "data": data})
 
 # Contact Routes
+async def store_spooled_messages(messages: list) -> bool:
+    """Insert contact submissions drained from the spool and announce the new ones"""
+    inserted = await Database.create_contact_messages(messages)
+    if inserted is None:
+        return False
+    for message in inserted:
+        await Database.create_notification(
+            {
+                "message": f"New message from {message['name']}: {message['message']}",
+                "type": NotificationType.MESSAGE,
+                "read": False,
+                "createdAt": datetime.utcnow(),
+            }
+        )
+    return True
+
+# Submissions are acknowledged once fsynced to a local spool and reach Mongo in the background
+contact_spool = ContactSpool(
+    os.environ.get("CONTACT_SPOOL_DIR", ROOT_DIR / "spool" / "contact"),
+    on_drain=store_spooled_messages,
+)
+
 @api_router.post("/contact")
-async def submit_contact_form(contact_data: ContactMessageCreate):
+async def submit_contact_form(contact_data: ContactMessageCreate, request: Request):
     """Submit contact form"""
+    enforce_rate_limit(contact_limiter, client_ip(request))
     try:
         message_dict = contact_data.dict()
         message_obj = ContactMessage(**message_dict)
-        message_id = await Database.create_contact_message(message_obj.dict())
+        message = message_obj.dict()
+        message["_id"] = ObjectId()
+
+        if contact_spool.running:
+            try:
+                await contact_spool.append(message)
+                return {"success": True, "message": "Message sent successfully!", "id": str(message["_id"])}
+            except Exception as e:
+                logger.error(f"Error spooling contact message, writing it directly: {e}")
+
+        message_id = await Database.create_contact_message(message)
 
         if message_id:
             await Database.create_notification(
@@ -200,13 +452,17 @@ async def submit_contact_form(contact_data: ContactMessageCreate):
         raise HTTPException(status_code=500, detail="Internal server error")
     
 @api_router.get("/footer")
-async def get_footer():
+async def get_footer(request: Request):
     """Get footer data"""
+    etag = section_cache.etag("footer")
+    cached = cached_response(request, "footer", etag)
+    if cached:
+        return cached
     try:
-        data = await Database.get_footer()
+        data = await section_cache.get("footer", Database.get_footer)
         if not data:
             raise HTTPException(status_code=404, detail="Footer data not found")
-        return {"success": True, "data": data}
+        return await encoded_response(request, "footer", etag, {"success": True, "data": data})
     except Exception as e:
         logger.error(f"Error getting footer data: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -217,11 +473,15 @@ async def get_footer():
 
 # Admin Authentication
 @api_router.post("/admin/login", response_model=Token)
-async def admin_login(login_data: AdminLogin):
+async def admin_login(login_data: AdminLogin, request: Request):
     """Admin login"""
+    # Shed excess attempts before any database or bcrypt work
+    enforce_rate_limit(login_ip_limiter, client_ip(request))
+    enforce_rate_limit(login_user_limiter, login_data.username, charge=False)
     try:
         admin = await authenticate_admin(login_data.username, login_data.password)
         if not admin:
+            login_user_limiter.hit(login_data.username)
             await Database.create_notification({
                 "message": f"ERROR Login Attempt: {login_data.username} failed to log in",
                 "type": NotificationType.ERROR,
@@ -235,7 +495,7 @@ async def admin_login(login_data: AdminLogin):
             )
         access_token_expires = timedelta(minutes=1440)  # 24 hours
         access_token = create_access_token(
-            data={"sub": admin["username"]}, expires_delta=access_token_expires
+            data=token_claims(admin), expires_delta=access_token_expires
         )
         await Database.create_notification({
             "message": f"SUCCESS Login: Admin {login_data.username} logged in",
@@ -283,7 +543,7 @@ async def create_new_admin(admin_data: AdminCreate, current_admin: dict = Depend
         )
     
     # Hash the password before storing
-    hashed_password = get_password_hash(admin_data.password)
+    hashed_password = await get_password_hash_async(admin_data.password)
     new_admin_data = {
         "username": admin_data.username,
         "password": hashed_password,
@@ -346,7 +606,9 @@ async def delete_admin_user(username: str, current_admin: dict = Depends(get_cur
             "createdAt": datetime.utcnow(),
         })
         raise HTTPException(status_code=404, detail="Admin not found")
-      
+    # Tokens already issued to the admin stop working even when they carry their own claims
+    await token_revocations.revoke_admin(username)
+
     await Database.create_notification(
         {
         "message": f"SUCCESS Admin Deletion: Admin {username} deleted by {current_admin['username']}",
@@ -363,61 +625,155 @@ async def list_admin_users(current_admin: dict = Depends(get_current_admin)):
     admins = await Database.get_admins()
     return {"success": True, "data": admins}
 
+MAX_SEARCH_QUERY_LENGTH = 100
+
 @api_router.get("/admin/search")
-async def search_content(q: str, current_admin: dict = Depends(get_current_admin)):
-    """Performs a site-wide search for the admin panel."""
+async def search_content(q: str, mode: str = "literal", current_admin: dict = Depends(get_current_admin)):
+    """Performs a site-wide search for the admin panel.
+
+    ``mode=literal`` (default) matches the query as plain text; ``mode=regex``
+    treats it as a regular expression and runs time-bounded queries in Mongo.
+    """
     if not q:
         raise HTTPException(status_code=400, detail="Search query cannot be empty")
-    
-    results = await Database.search_content(q)
-    return {"success": True, "data": results}
+    if len(q) > MAX_SEARCH_QUERY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Search query cannot be longer than {MAX_SEARCH_QUERY_LENGTH} characters")
+    if mode not in ("literal", "regex"):
+        raise HTTPException(status_code=400, detail="Search mode must be 'literal' or 'regex'")
+
+    started = time.perf_counter()
+    if mode == "regex":
+        try:
+            regex.compile(q)
+        except regex.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid regular expression: {e}")
+        results = await Database.search_content(q, use_regex=True)
+    else:
+        try:
+            results = await search_index.search(q)
+        except Exception as e:
+            # Fall back to querying Mongo directly if the index can't be refreshed
+            logger.error(f"Error searching index, falling back to database: {e}")
+            results = await Database.search_content(q)
+
+    took_ms = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"Admin search ({mode}) for {q!r} took {took_ms}ms")
+    if results is None:
+        raise HTTPException(status_code=408, detail="Search took too long, try a simpler query")
+    return {"success": True, "data": results, "mode": mode, "took_ms": took_ms}
+
+@api_router.get("/admin/search/suggest")
+async def search_suggestions(q: str, limit: int = 8, current_admin: dict = Depends(get_current_admin)):
+    """Typeahead completions for the admin search box"""
+    limit = max(1, min(limit, 20))
+    try:
+        suggestions = await search_index.suggest(q[:MAX_SEARCH_QUERY_LENGTH], limit)
+    except Exception as e:
+        logger.error(f"Error getting search suggestions: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return {"success": True, "data": suggestions}
 
 @api_router.get("/admin/dashboard-summary")
 async def get_dashboard_summary(current_admin: dict = Depends(get_current_admin)):
     """Get a summary of data for the admin dashboard"""
     try:
-        projects = await Database.get_projects()
-        messages = await Database.get_contact_messages()
-        skills = await Database.get_skills()
-
-        unread_messages = [m for m in messages if not m.get('read', False)]
-        
-        # --- ADD THIS LINE ---
-        unread_notification_count = await notifications_collection.count_documents({"read": False})
-        
-        summary = {
-            "project_count": len(projects),
-            "message_count": len(messages),
-            "unread_message_count": len(unread_messages),
-            "skill_category_count": len(skills.keys()),
-            "recent_messages": unread_messages[:5], # Increased to 5 for the popover
-            "unread_notification_count": unread_notification_count, # <-- AND ADD THIS LINE
-        }
+        # Counters are maintained by the write paths instead of scanning every collection
+        summary = await Database.get_dashboard_summary(current_admin["username"])
+        if summary is None:
+            raise HTTPException(status_code=500, detail="Failed to load dashboard summary")
         return {"success": True, "data": summary}
     except Exception as e:
         logger.error(f"Error getting dashboard summary: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.post("/admin/events/ticket")
+async def create_event_stream_ticket(current_admin: dict = Depends(get_current_admin)):
+    """Issue a single-use ticket for opening the event stream, so the token stays out of the URL"""
+    return {"success": True, "ticket": stream_tickets.issue(current_admin), "expires_in": stream_tickets.ttl}
+
+@api_router.get("/admin/events")
+async def admin_event_stream(request: Request, current_admin: dict = Depends(get_current_admin_from_ticket)):
+    """Server-Sent Events stream of notifications and dashboard summary updates"""
+    username = current_admin["username"]
+
+    async def event_stream():
+        queue = event_bus.subscribe()
+        try:
+            # Start every connection in sync with the current summary
+            summary = await Database.get_dashboard_summary(username)
+            if summary is not None:
+                yield format_sse("summary", summary)
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                    if event == "summary":
+                        # Read state is per admin, so add this subscriber's own count
+                        data = {**data, "unread_notification_count": await Database.get_unread_notification_count(username)}
+                    yield format_sse(event, data)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/admin/metrics")
+async def get_metrics(current_admin: dict = Depends(get_current_admin)):
+    """Internal counters for background pipelines"""
+    return {
+        "success": True,
+        "data": {
+            "notification_writer": notification_writer.get_stats(),
+            "contact_spool": contact_spool.get_stats(),
+            "principal_cache": principal_cache.get_stats(),
+            "image_pipeline": image_pipeline.get_stats(),
+            "rate_limits": {
+                limiter.name: limiter.get_stats()
+                for limiter in (contact_limiter, login_ip_limiter, login_user_limiter)
+            },
+            "event_subscribers": event_bus.subscriber_count,
+            "dropped_events": event_bus.dropped,
+        },
+    }
+
 @api_router.post("/admin/upload-resume")
 async def upload_resume(file: UploadFile = File(...), current_admin: dict = Depends(get_current_admin)):
     """Upload a new resume file"""
     try:
-        # Define the path where the file will be saved
-        file_path = UPLOAD_DIR / file.filename
-        
-        # Save the uploaded file to the specified path
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Return the URL that can be used to access the file
-        file_url = f"/static/{file.filename}"
+        # Never trust the client's path; keep only the final component
+        filename = Path(file.filename or "").name
+        if not filename:
+            raise HTTPException(status_code=400, detail="Missing file name")
+
+        stored = await blob_store.put(file, filename)
+        await blob_store.collect_garbage()
+
+        # The content-addressed URL never changes, so it can be cached forever
+        file_url = f"/static/{stored['blob']}"
         await Database.create_notification({
             "message": f"UPDATE Profile: Admin {current_admin['username']} made changes in Resume.",
             "type": NotificationType.UPDATE,
             "read": False,
             "createdAt": datetime.utcnow(),
         })
-        return {"success": True, "message": "File uploaded successfully", "url": file_url}
+        return {
+            "success": True,
+            "message": "File uploaded successfully",
+            "url": file_url,
+            "logical_url": f"/static/{filename}",
+            "size": stored["size"],
+            "sha256": stored["sha256"],
+        }
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         await Database.create_notification({
             "message": f"ERROR Profile: Admin {current_admin['username']} failed to upload resume.",
@@ -428,6 +784,33 @@ async def upload_resume(file: UploadFile = File(...), current_admin: dict = Depe
         logger.error(f"Error uploading resume: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload file")
 
+@api_router.post("/admin/upload-image")
+async def upload_image(file: UploadFile = File(...), current_admin: dict = Depends(get_current_admin)):
+    """Upload a profile or project image; resized variants are generated in the background"""
+    filename = Path(file.filename or "").name
+    if not filename:
+        raise HTTPException(status_code=400, detail="Missing file name")
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="Only image files can be uploaded")
+    try:
+        stored = await blob_store.put(file, filename)
+        await blob_store.collect_garbage()
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error uploading image: {e}")
+        raise HTTPException(status_code=500, detail="Failed to upload file")
+
+    file_url = f"/static/{stored['blob']}"
+    image_pipeline.schedule(file_url)
+    return {
+        "success": True,
+        "message": "Image uploaded successfully",
+        "url": file_url,
+        "size": stored["size"],
+        "sha256": stored["sha256"],
+    }
+
 # Admin Profile Management
 @api_router.put("/admin/profile")
 async def update_profile(profile_data: ProfileBase, current_admin: dict = Depends(get_current_admin)):
@@ -436,6 +819,9 @@ async def update_profile(profile_data: ProfileBase, current_admin: dict = Depend
         profile_dict = profile_data.dict()
         profile_obj = Profile(**profile_dict)
         success = await Database.update_profile(profile_obj.dict())
+        section_cache.invalidate("profile")
+        if success:
+            image_pipeline.schedule(profile_obj.profileImage)
         
         if success:
             await Database.create_notification({
@@ -467,6 +853,7 @@ async def update_skills(category: str, skills: List[Skill], current_admin: dict
         skills_as_dicts = [skill.dict() for skill in skills]
         
         success = await Database.update_skills(category, skills_as_dicts)
+        section_cache.invalidate("skills")
         
         if success:
             await Database.create_notification({
@@ -494,6 +881,7 @@ async def delete_skills_category(category: str, current_admin: dict = Depends(ge
     """Delete a skill category"""
     try:
         success = await Database.delete_skills_category(category)
+        section_cache.invalidate("skills")
         if success:
             await Database.create_notification({
                 "message": f"SUCCESS Skills: Admin {current_admin['username']} deleted category {category}.",
@@ -522,6 +910,9 @@ async def create_project(project_data: ProjectCreate, current_admin: dict = Depe
         project_dict = project_data.dict()
         project_obj = Project(**project_dict)
         project_id = await Database.create_project(project_obj.dict())
+        section_cache.invalidate("projects")
+        if project_id:
+            image_pipeline.schedule(project_obj.image)
         
         if project_id:
             await Database.create_notification({
@@ -551,6 +942,9 @@ async def update_project(project_id: str, project_data: ProjectUpdate, current_a
         if update_dict:
             update_dict["updatedAt"] = datetime.utcnow()
             success = await Database.update_project(project_id, update_dict)
+            section_cache.invalidate("projects")
+            if success:
+                image_pipeline.schedule(update_dict.get("image"))
             
             if success:
                 await Database.create_notification({
@@ -585,6 +979,7 @@ async def delete_project(project_id: str, current_admin: dict = Depends(get_curr
     """Delete project"""
     try:
         success = await Database.delete_project(project_id)
+        section_cache.invalidate("projects")
         
         if success:
             await Database.create_notification({
@@ -614,6 +1009,7 @@ async def update_education(education_data: EducationBase, current_admin: dict =
         education_dict = education_data.dict()
         education_obj = Education(**education_dict)
         success = await Database.update_education(education_obj.dict())
+        section_cache.invalidate("education")
         
         if success:
             await Database.create_notification({
@@ -643,6 +1039,7 @@ async def update_experience(experience_data: ExperienceBase, current_admin: dict
         experience_dict = experience_data.dict()
         experience_obj = Experience(**experience_dict)
         success = await Database.update_experience(experience_obj.dict())
+        section_cache.invalidate("experience")
         
         if success:
             await Database.create_notification({
@@ -670,6 +1067,7 @@ async def create_learning_phase(phase_data: LearningJourneyCreate, current_admin
     try:
         phase_dict = phase_data.dict()
         phase_id = await Database.create_learning_phase(phase_dict)
+        section_cache.invalidate("learning_journey")
         if phase_id:
             await Database.create_notification({
                 "message": f"SUCCESS Learning Journey: Admin {current_admin['username']} created new learning phase {phase_data.phase}.",
@@ -699,6 +1097,7 @@ async def update_learning_phase(phase_id: str, phase_data: LearningJourneyUpdate
         
         update_dict["updatedAt"] = datetime.utcnow()
         success = await Database.update_learning_phase(phase_id, update_dict)
+        section_cache.invalidate("learning_journey")
         if success:
             await Database.create_notification({
                 "message": f"SUCCESS UPDATE Learning Journey: Admin {current_admin['username']} made changes in phase {phase_data.phase}.",
@@ -723,6 +1122,7 @@ async def delete_learning_phase(phase_id: str, current_admin: dict = Depends(get
     """Delete a learning journey phase"""
     try:
         success = await Database.delete_learning_phase(phase_id)
+        section_cache.invalidate("learning_journey")
         if success:
             await Database.create_notification({
                 "message": f"SUCCESS DELETE Learning Journey: Admin {current_admin['username']} deleted phase with ID {phase_id}.",
@@ -747,6 +1147,7 @@ async def update_growth_mindset(data: GrowthMindsetBase, current_admin: dict = D
     """Update growth mindset data"""
     try:
         success = await Database.update_growth_mindset(data.dict())
+        section_cache.invalidate("growth_mindset")
         if success:
             await Database.create_notification({
                 "message": f"SUCCESS UPDATE Growth Mindset: Admin {current_admin['username']} made changes in Growth Mindset Section.",
@@ -771,6 +1172,7 @@ async def update_experiments_section(data: ExperimentsSectionData, current_admin
     """Update the entire experiments section"""
     try:
         success = await Database.update_experiments_section(data.dict())
+        section_cache.invalidate("experiments")
         if success:
             await Database.create_notification({
                 "message": f"SUCCESS UPDATE Experiments: Admin {current_admin['username']} made changes in Experiments Section.",
@@ -794,6 +1196,7 @@ async def update_experiments_section(data: ExperimentsSectionData, current_admin
 async def update_contact_section(data: ContactSectionData, current_admin: dict = Depends(get_current_admin)):
     """Update contact section data"""
     success = await Database.update_contact_section(data.dict())
+    section_cache.invalidate("contact_section")
     if success:
         await Database.create_notification({
             "message": f"SUCCESS UPDATE Contact: Admin {current_admin['username']} made changes in Contact Section.",
@@ -810,16 +1213,68 @@ async def update_contact_section(data: ContactSectionData, current_admin: dict =
     })
     raise HTTPException(status_code=500, detail="Failed to update contact section")
 
+def parse_keyset_cursor(cursor: str):
+    """Parse a "<createdAt ISO>,<id>" keyset cursor"""
+    try:
+        created_at, document_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), ObjectId(document_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_cursor(document: dict) -> str:
+    """Build the keyset cursor that continues after ``document``"""
+    return f"{document['createdAt'].isoformat()},{document['id']}"
+
+def parse_bulk_ids(request_data):
+    """Validate a bulk request's target and return its ids as ObjectIds (None for a filter).
+
+    Exactly one of ``ids``, a ``filter`` with at least one field set, or
+    ``all: true`` is accepted, so an empty selector can't touch everything.
+    """
+    targets = [request_data.ids is not None, request_data.filter is not None, request_data.all]
+    if sum(targets) != 1:
+        raise HTTPException(status_code=400, detail="Provide exactly one of ids, filter or all")
+    if request_data.filter is not None and all(value is None for value in request_data.filter.dict().values()):
+        raise HTTPException(status_code=400, detail="Filter must set at least one field; use all to select everything")
+    if request_data.ids is None:
+        return None
+    if len(request_data.ids) > MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} ids per request")
+    try:
+        return [ObjectId(document_id) for document_id in request_data.ids]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid id")
+
 # Admin Messages Management
 @api_router.get("/admin/messages")
-async def get_contact_messages(current_admin: dict = Depends(get_current_admin)):
-    """Get all contact messages"""
-    try:
-        messages = await Database.get_contact_messages()
-        return {"success": True, "data": messages, "total": len(messages)}
-    except Exception as e:
-        logger.error(f"Error getting contact messages: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+async def get_contact_messages(
+    limit: int = 50,
+    before: Optional[str] = None,
+    read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_admin: dict = Depends(get_current_admin),
+):
+    """Page through contact message summaries, newest first.
+
+    Pass the returned ``next_cursor`` as ``before`` to fetch the next page;
+    the full body is available from ``/admin/messages/{message_id}``.
+    """
+    limit = max(1, min(limit, 100))
+    cursor = parse_keyset_cursor(before) if before else None
+    messages = await Database.get_contact_messages(
+        limit=limit, before=cursor, read=read, since=since, until=until
+    )
+    next_cursor = keyset_cursor(messages[-1]) if len(messages) == limit else None
+    return {"success": True, "data": messages, "next_cursor": next_cursor}
+
+@api_router.get("/admin/messages/{message_id}")
+async def get_contact_message(message_id: str, current_admin: dict = Depends(get_current_admin)):
+    """Get a single contact message with its full body"""
+    message = await Database.get_contact_message(message_id)
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return {"success": True, "data": message}
 
 @api_router.put("/admin/messages/{message_id}/read")
 async def mark_message_read(message_id: str, current_admin: dict = Depends(get_current_admin)):
@@ -873,11 +1328,43 @@ async def delete_contact_message(message_id: str, current_admin: dict = Depends(
         logger.error(f"Error deleting message: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     
+@api_router.post("/admin/messages/bulk")
+async def bulk_update_messages(request_data: MessageBulkRequest, current_admin: dict = Depends(get_current_admin)):
+    """Mark as read or delete many messages, given by ids or a filter, in one call"""
+    ids = parse_bulk_ids(request_data)
+    bulk_filter = request_data.filter or MessageBulkFilter()
+    if request_data.action == BulkAction.READ:
+        count = await Database.bulk_mark_messages_read(ids, since=bulk_filter.since, until=bulk_filter.until)
+        done, notification_type = "marked {} messages as read", NotificationType.UPDATE
+    else:
+        count = await Database.bulk_delete_messages(
+            ids, read=bulk_filter.read, since=bulk_filter.since, until=bulk_filter.until
+        )
+        done, notification_type = "deleted {} messages", NotificationType.SUCCESS
+
+    if count is None:
+        await Database.create_notification({
+            "message": f"ERROR Messages: Admin {current_admin['username']} failed to {request_data.action.value} messages in bulk.",
+            "type": NotificationType.ERROR,
+            "read": False,
+            "createdAt": datetime.utcnow(),
+        })
+        raise HTTPException(status_code=500, detail="Bulk message update failed")
+
+    await Database.create_notification({
+        "message": f"SUCCESS BULK Messages: Admin {current_admin['username']} {done.format(count)}.",
+        "type": notification_type,
+        "read": False,
+        "createdAt": datetime.utcnow(),
+    })
+    return {"success": True, "count": count}
+
 @api_router.put("/admin/footer")
 async def update_footer(data: FooterData, current_admin: dict = Depends(get_current_admin)):
     """Update footer data"""
     try:
         success = await Database.update_footer(data.dict())
+        section_cache.invalidate("footer")
         if success:
             await Database.create_notification({
                 "message": f"SUCCESS UPDATE Footer: Admin {current_admin['username']} made changes in Footer Section.",
@@ -897,30 +1384,67 @@ async def update_footer(data: FooterData, current_admin: dict = Depends(get_curr
         logger.error(f"Error updating footer: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     
+NOTIFICATION_FIELDS = {"message", "type", "createdAt", "read", "count", "lastSeenAt"}
+
 @api_router.get("/admin/notifications")
-async def get_all_notifications(current_admin: dict = Depends(get_current_admin)):
-    notifications = await Database.get_notifications()
-    unread_count = await notifications_collection.count_documents({"read": False})
-    return {"success": True, "data": notifications, "unread_count": unread_count}
+async def get_all_notifications(
+    limit: int = 100,
+    before: Optional[str] = None,
+    type: Optional[NotificationType] = None,
+    read: Optional[bool] = None,
+    fields: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin),
+):
+    """Page through notifications, newest first.
+
+    Pass the returned ``next_cursor`` as ``before`` to fetch the next page.
+    """
+    limit = max(1, min(limit, 100))
+    cursor = parse_keyset_cursor(before) if before else None
+    projection = None
+    if fields:
+        projection = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(projection) - NOTIFICATION_FIELDS - {"id"})
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        projection = [f for f in projection if f not in ("id", "read")]
+
+    username = current_admin["username"]
+    notifications, unread_count = await asyncio.gather(
+        Database.get_notifications(
+            username,
+            limit=limit,
+            before=cursor,
+            notification_type=type.value if type else None,
+            read=read,
+            fields=projection,
+        ),
+        Database.get_unread_notification_count(username),
+    )
+
+    next_cursor = keyset_cursor(notifications[-1]) if len(notifications) == limit else None
+    return {"success": True, "data": notifications, "unread_count": unread_count, "next_cursor": next_cursor}
 
 @api_router.put("/admin/notifications/{notification_id}/read")
 async def mark_one_as_read(notification_id: str, current_admin: dict = Depends(get_current_admin)):
     """Marks a single notification as read."""
-    success = await Database.mark_notification_as_read(notification_id)
+    success = await Database.mark_notification_as_read(notification_id, current_admin["username"])
     if not success:
         raise HTTPException(status_code=404, detail="Notification not found or already read")
     return {"success": True, "message": "Notification marked as read"}
 
 @api_router.post("/admin/notifications/mark-read")
 async def mark_as_read(current_admin: dict = Depends(get_current_admin)):
-    success = await Database.mark_notifications_as_read()
+    # Timestamp the audit notification before moving the watermark so it counts as read
+    created_at = datetime.utcnow()
+    success = await Database.mark_notifications_as_read(current_admin["username"])
     if not success:
         raise HTTPException(status_code=500, detail="Failed to mark notifications as read")
     await Database.create_notification({
         "message": f"SUCCESS UPDATE Notifications: Admin {current_admin['username']} marked all notifications as read.",
         "type": NotificationType.INFO,
         "read": True,
-        "createdAt": datetime.utcnow(),
+        "createdAt": created_at,
     })
     return {"success": True, "message": "Notifications marked as read"}
 
@@ -938,9 +1462,41 @@ async def clear_all_notifications(current_admin: dict = Depends(get_current_admi
     })
     return {"success": True, "message": "All notifications cleared"}
 
+@api_router.post("/admin/notifications/bulk")
+async def bulk_update_notifications(request_data: NotificationBulkRequest, current_admin: dict = Depends(get_current_admin)):
+    """Mark as read or delete many notifications, given by ids or a filter, in one call"""
+    ids = parse_bulk_ids(request_data)
+    bulk_filter = request_data.filter or NotificationBulkFilter()
+    notification_type = bulk_filter.type.value if bulk_filter.type else None
+    truncated = False
+    if request_data.action == BulkAction.READ:
+        result = await Database.bulk_mark_notifications_read(
+            current_admin["username"], ids, notification_type, since=bulk_filter.since, until=bulk_filter.until
+        )
+        count, truncated = result if result is not None else (None, False)
+        done = "marked {} notifications as read"
+    else:
+        count = await Database.bulk_delete_notifications(
+            ids, notification_type, since=bulk_filter.since, until=bulk_filter.until
+        )
+        done = "deleted {} notifications"
+
+    if count is None:
+        raise HTTPException(status_code=500, detail="Bulk notification update failed")
+    await Database.create_notification({
+        "message": f"SUCCESS BULK Notifications: Admin {current_admin['username']} {done.format(count)}.",
+        "type": NotificationType.INFO,
+        "read": False,
+        "createdAt": datetime.utcnow(),
+    })
+    # truncated: the per-admin read list is full, so some matches are still unread
+    return {"success": True, "count": count, "truncated": truncated}
+
 @api_router.post("/admin/logout-notify")
 async def notify_logout(current_admin: dict = Depends(get_current_admin)):
-    """Creates a notification when a user logs out."""
+    """Creates a notification when a user logs out and revokes the token used."""
+    if current_admin.get("tokenId"):
+        await token_revocations.revoke_token(current_admin["tokenId"], current_admin["tokenExpiresAt"])
     await Database.create_notification({
         "message": f"Admin '{current_admin.get('username')}' logged out.",
         "type": NotificationType.SECURITY,
@@ -958,6 +1514,17 @@ origins = [
     # "https://your-deployed-portfolio-url.com" # You can add your live site URL here later
 ]
 
+# Behind the ingress, take the client address from X-Forwarded-For, but only
+# when the connection comes from one of these proxies (same setting as uvicorn's
+# --forwarded-allow-ips), so visitors don't all share one rate-limit bucket
+app.add_middleware(
+    ProxyHeadersMiddleware,
+    trusted_hosts=[host.strip() for host in os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1").split(",")],
+)
+
+# Upload size cap, enforced before FastAPI parses the multipart body
+app.add_middleware(UploadLimitMiddleware, paths={"/api/admin/upload-resume", "/api/admin/upload-image"})
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
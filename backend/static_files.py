@@ -0,0 +1,173 @@
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+CHUNK_SIZE = 256 * 1024
+# Precompressed siblings written next to a file, best first
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class StaticFileResponse(Response):
+    """Send a file, or a byte range of it, as efficiently as the server allows.
+
+    Uses the ASGI ``http.response.zerocopy`` extension (sendfile) when the
+    server offers it, ``http.response.pathsend`` for whole files, and chunked
+    reads in a worker thread otherwise.
+    """
+
+    def __init__(self, path: Path, status_code: int, headers: dict, media_type: str = None,
+                 offset: int = 0, count: int = 0, send_body: bool = True):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.send_body = send_body
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopy" in extensions:
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            return
+        if "http.response.pathsend" in extensions and self.offset == 0 and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # The file shrank underneath us; end the body rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def _parse_range(range_header: str, size: int):
+    """Parse a single byte range; returns (start, end) inclusive, None to ignore it, or "unsatisfiable" """
+    match = RANGE_RE.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # multiple or malformed ranges: serve the whole file
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None  # invalid range (RFC 9110 14.1.1): ignore it like any malformed one
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def file_response(path: Path, stat_result: os.stat_result, scope, etag: str = None) -> Response:
+    """Build the response for a static file request.
+
+    Handles conditional requests against a strong ETag (the caller's content
+    hash when it has one), single-range requests on the identity encoding,
+    and serves a precompressed ``.br``/``.gz`` sibling when the client
+    accepts it and no range was requested.
+    """
+    request_headers = Headers(scope=scope)
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if etag is None:
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+    siblings = {
+        coding: path.with_name(path.name + suffix)
+        for coding, suffix in PRECOMPRESSED
+        if path.with_name(path.name + suffix).is_file()
+    }
+    headers = {
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if siblings:
+        headers["Vary"] = "Accept-Encoding"
+
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if range_header and if_range and if_range.strip() != etag:
+        range_header = None  # the client's copy is stale; send everything
+
+    # Pick the representation: a precompressed sibling unless a range was asked for
+    serve_path, size = path, stat_result.st_size
+    if not range_header:
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        for candidate, sibling in siblings.items():
+            if candidate in accepted:
+                serve_path, size = sibling, sibling.stat().st_size
+                etag = f'{etag[:-1]}-{candidate}"'
+                headers["Content-Encoding"] = candidate
+                break
+    headers["ETag"] = etag
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Encoding"})
+    elif request_headers.get("if-modified-since"):
+        try:
+            if int(stat_result.st_mtime) <= parsedate_to_datetime(request_headers["if-modified-since"]).timestamp():
+                return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Encoding"})
+        except (TypeError, ValueError):
+            pass
+
+    send_body = scope["method"] != "HEAD"
+    if range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range == "unsatisfiable":
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}", "ETag": etag})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StaticFileResponse(serve_path, 206, headers, media_type, start, end - start + 1, send_body)
+
+    headers["Content-Length"] = str(size)
+    return StaticFileResponse(serve_path, 200, headers, media_type, 0, size, send_body)
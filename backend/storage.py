@@ -0,0 +1,371 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from static_files import PRECOMPRESSED, file_response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, blobs are then precompressed with gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Blob types worth storing precompressed; images and archives are already compressed
+COMPRESSIBLE_SUFFIXES = {".pdf", ".svg", ".txt", ".json", ".css", ".js", ".html", ".xml", ".md"}
+
+
+def format_size(num_bytes: int) -> str:
+    """Human-readable size for error messages, e.g. "10 MB", "1.5 MB", "196 KB" """
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f}".removesuffix(".0") + " MB"
+    if num_bytes >= 1024:
+        return f"{-(-num_bytes // 1024)} KB"
+    return f"{num_bytes} bytes"
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured maximum size"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware capping the request body size on upload routes.
+
+    FastAPI parses (and spools to disk) a whole multipart form before any route
+    dependency runs, authentication included, so the limit is enforced here: a
+    declared Content-Length over ``max_bytes`` gets a 413 before anything is
+    read, and a body that streams past it is cut off with the same response.
+    """
+
+    def __init__(self, app, paths, max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    too_large = True
+                    raise UploadTooLarge(self.max_bytes)
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if too_large and not response_started:
+                return  # replaced by the 413 below
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # FastAPI may turn the aborted read into its own error response
+            # or let it propagate; either way the client gets the 413.
+            if not too_large:
+                raise
+        if too_large and not response_started:
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"File is larger than {format_size(MAX_UPLOAD_BYTES)}"},
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
+
+
+class StoredFile:
+    """Where an upload ended up, with its size and SHA-256"""
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+def _write_chunk(handle, digest, chunk: bytes):
+    digest.update(chunk)
+    handle.write(chunk)
+
+
+def _commit(handle, temp_path: str, final_path: Path):
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+    os.chmod(temp_path, 0o644)  # mkstemp creates files readable by the owner only
+    os.replace(temp_path, final_path)
+
+
+def _discard(handle, temp_path: str):
+    handle.close()
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _precompress(blob_path: Path):
+    # Keep a variant only where it actually saves something
+    with open(blob_path, "rb") as f:
+        data = f.read()
+    variants = {".gz": gzip.compress(data, compresslevel=9)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) >= len(data) * 0.9:
+            continue
+        fd, temp_path = tempfile.mkstemp(dir=blob_path.parent, prefix=".incoming-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, blob_path.with_name(blob_path.name + suffix))
+
+
+async def save_upload(upload: UploadFile, destination: Path, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredFile:
+    """Stream an upload to ``destination`` in chunks, off the event loop.
+
+    The file is hashed while it's copied and written to a temporary file in the
+    same directory that is renamed into place only once complete, so readers
+    never see a partial file. Raises UploadTooLarge past ``max_bytes``.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=destination.parent, prefix=".upload-")
+    handle = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            await asyncio.to_thread(_write_chunk, handle, digest, chunk)
+        await asyncio.to_thread(_commit, handle, temp_path, destination)
+    except BaseException:
+        await asyncio.to_thread(_discard, handle, temp_path)
+        raise
+    return StoredFile(destination, size, digest.hexdigest())
+
+
+class BlobStore:
+    """Content-addressed upload storage with a manifest of logical names.
+
+    Uploads are stored once under ``blobs/<sha256><ext>`` and never change, so
+    they can be cached forever. ``.manifest.json`` maps each logical name (e.g.
+    ``resume.pdf``) to its current blob. A blob's reference count is the number
+    of logical names pointing at it plus any references ``references()``
+    reports (e.g. URLs saved in the profile); blobs nobody references are
+    deleted once they've been orphaned for ``grace_seconds``, which leaves time
+    to save a form that uses a freshly uploaded file.
+    """
+
+    def __init__(self, root: Path, references=None, grace_seconds: float = 24 * 3600):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.manifest_path = self.root / ".manifest.json"
+        self.references = references  # async () -> set of blob paths relative to root, or None if unknown
+        self.grace_seconds = grace_seconds
+        self._lock = None  # created on first use, inside the running loop
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {}
+        except ValueError as e:
+            logger.error(f"Unreadable storage manifest, starting empty: {e}")
+            manifest = {}
+        manifest.setdefault("files", {})
+        manifest.setdefault("orphans", {})  # blob -> unix time it lost its last logical name
+        return manifest
+
+    def _save_manifest(self, manifest: dict):
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".manifest-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.manifest_path)
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def resolve(self, name: str):
+        """Current blob path (relative to the root) for a logical name, or None"""
+        entry = self._manifest["files"].get(name)
+        return entry["blob"] if entry else None
+
+    def refcounts(self) -> dict:
+        """Number of logical names pointing at each blob"""
+        counts = {}
+        for entry in self._manifest["files"].values():
+            counts[entry["blob"]] = counts.get(entry["blob"], 0) + 1
+        return counts
+
+    async def put(self, upload: UploadFile, name: str, max_bytes: int = MAX_UPLOAD_BYTES) -> dict:
+        """Store an upload under its content hash and point ``name`` at it"""
+        incoming = self.blob_dir / f".incoming-{uuid.uuid4().hex}"
+        stored = await save_upload(upload, incoming, max_bytes)
+        blob = f"blobs/{stored.sha256}{Path(name).suffix.lower()}"
+        blob_path = self.root / blob
+        if blob_path.exists():
+            # Same content uploaded before; keep the existing blob
+            await asyncio.to_thread(os.unlink, incoming)
+        else:
+            await asyncio.to_thread(os.replace, incoming, blob_path)
+            await self._precompress(blob_path)
+
+        async with self._get_lock():
+            manifest = json.loads(json.dumps(self._manifest))
+            previous = manifest["files"].get(name)
+            manifest["files"][name] = {
+                "blob": blob,
+                "sha256": stored.sha256,
+                "size": stored.size,
+                "updatedAt": time.time(),
+            }
+            manifest["orphans"].pop(blob, None)
+            if previous and previous["blob"] != blob:
+                if not any(e["blob"] == previous["blob"] for e in manifest["files"].values()):
+                    manifest["orphans"][previous["blob"]] = time.time()
+            await asyncio.to_thread(self._save_manifest, manifest)
+            self._manifest = manifest
+        return manifest["files"][name]
+
+    def _write_blob(self, data: bytes, blob_path: Path):
+        fd, temp_path = tempfile.mkstemp(dir=self.blob_dir, prefix=".incoming-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, blob_path)
+
+    async def put_bytes(self, data: bytes, suffix: str) -> str:
+        """Store generated content (e.g. image derivatives) by hash; returns its blob path"""
+        blob = f"blobs/{hashlib.sha256(data).hexdigest()}{suffix}"
+        blob_path = self.root / blob
+        if not blob_path.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(self._write_blob, data, blob_path)
+            await self._precompress(blob_path)
+        return blob
+
+    async def _precompress(self, blob_path: Path):
+        if blob_path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            return
+        try:
+            await asyncio.to_thread(_precompress, blob_path)
+        except OSError as e:
+            # The blob itself is stored; it's just served uncompressed
+            logger.error(f"Error precompressing {blob_path.name}: {e}")
+
+    async def collect_garbage(self) -> int:
+        """Delete orphaned blobs past the grace period that nothing references; returns how many"""
+        try:
+            referenced = await self.references() if self.references else set()
+        except Exception as e:
+            logger.error(f"Error reading blob references, skipping garbage collection: {e}")
+            referenced = None
+        if referenced is None:
+            return 0  # references unknown (e.g. database down); delete nothing
+        async with self._get_lock():
+            manifest = json.loads(json.dumps(self._manifest))
+            counts = self.refcounts()
+            now = time.time()
+            removed = []
+            for blob, orphaned_at in list(manifest["orphans"].items()):
+                if counts.get(blob) or blob in referenced:
+                    continue  # still in use; stays orphan-listed until actually unused
+                if now - orphaned_at < self.grace_seconds:
+                    continue
+                for path in [blob] + [blob + suffix for _, suffix in PRECOMPRESSED]:
+                    try:
+                        await asyncio.to_thread(os.unlink, self.root / path)
+                    except FileNotFoundError:
+                        pass
+                del manifest["orphans"][blob]
+                removed.append(blob)
+            if removed:
+                await asyncio.to_thread(self._save_manifest, manifest)
+                self._manifest = manifest
+                logger.info(f"Removed {len(removed)} orphaned blob(s) from static storage.")
+        return len(removed)
+
+
+class BlobStaticFiles(StaticFiles):
+    """StaticFiles for a BlobStore root.
+
+    Content-addressed ``blobs/`` paths are served as immutable; logical names
+    resolve to their current blob and must be revalidated. Dotfiles (the
+    manifest, in-progress uploads) are never served. Files are sent by
+    ``static_files.file_response``: byte ranges, precompressed variants and
+    sendfile where the server supports it.
+    """
+
+    def __init__(self, *, directory, store: BlobStore, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.store = store
+
+    async def get_response(self, path: str, scope):
+        parts = Path(path).parts
+        if any(part.startswith(".") for part in parts):
+            raise HTTPException(status_code=404)
+        immutable = bool(parts) and parts[0] == "blobs"
+        blob = None if immutable else self.store.resolve("/".join(parts))
+        response = await super().get_response(blob or path, scope)
+        if response.status_code in (200, 206, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else "no-cache"
+        return response
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        full_path = Path(full_path)
+        # Blob names are their SHA-256, which makes a ready-made strong ETag
+        digest = full_path.stem
+        etag = f'"{digest}"' if full_path.parent.name == "blobs" and len(digest) == 64 else None
+        return file_response(full_path, stat_result, scope, etag)
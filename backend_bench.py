@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Public endpoint latency during a burst of admin logins.
+
+Samples GET /api/profile latency on its own, then again while a pool of
+threads hammers POST /api/admin/login, and prints p50/p95/p99 for both.
+Run it against the backend before and after a change to compare. Start the
+backend with RATE_LIMIT_ENABLED=false so the logins reach bcrypt.
+
+    python backend_bench.py --logins 200 --concurrency 20
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def get_backend_url():
+    if os.environ.get("BACKEND_URL"):
+        return os.environ["BACKEND_URL"]
+    try:
+        with open('/app/frontend/.env', 'r') as f:
+            for line in f:
+                if line.startswith('REACT_APP_BACKEND_URL='):
+                    return line.split('=', 1)[1].strip()
+    except Exception as e:
+        print(f"Error reading backend URL: {e}")
+    return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    print(
+        f"{label}: n={len(samples)} "
+        f"p50={percentile(samples, 50):.1f}ms "
+        f"p95={percentile(samples, 95):.1f}ms "
+        f"p99={percentile(samples, 99):.1f}ms "
+        f"max={max(samples):.1f}ms"
+    )
+
+
+def sample_public(api_base, stop, samples, interval):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{api_base}/profile", timeout=30)
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+
+
+def login(api_base, username, password):
+    requests.post(f"{api_base}/admin/login", json={"username": username, "password": password}, timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200, help="login attempts in the burst")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent login threads")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0, help="sampling time without load")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between public requests")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="wrong-password")
+    args = parser.parse_args()
+
+    backend_url = get_backend_url()
+    if not backend_url:
+        print("❌ Could not get backend URL (set BACKEND_URL or frontend/.env)")
+        sys.exit(1)
+    api_base = f"{backend_url}/api"
+    print(f"🔗 Benchmarking backend at: {api_base}")
+
+    # Baseline
+    stop, baseline = threading.Event(), []
+    sampler = threading.Thread(target=sample_public, args=(api_base, stop, baseline, args.interval))
+    sampler.start()
+    time.sleep(args.baseline_seconds)
+    stop.set()
+    sampler.join()
+
+    # During the login burst
+    stop, loaded = threading.Event(), []
+    sampler = threading.Thread(target=sample_public, args=(api_base, stop, loaded, args.interval))
+    sampler.start()
+    burst_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.logins):
+            pool.submit(login, api_base, args.username, args.password)
+    burst_seconds = time.perf_counter() - burst_start
+    stop.set()
+    sampler.join()
+
+    report("GET /api/profile (idle)      ", baseline)
+    report("GET /api/profile (login burst)", loaded)
+    print(f"{args.logins} logins in {burst_seconds:.1f}s ({args.logins / burst_seconds:.1f}/s)")
+
+
+if __name__ == "__main__":
+    main()
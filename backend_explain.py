@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Query plan check for the hot queries in backend/database.py.
+
+Applies the index catalog (Database.create_indexes, twice, to check it is
+idempotent) to a scratch database on a local mongod, runs explain() on each
+query below and exits non-zero if any winning plan contains a COLLSCAN or
+an in-memory SORT. The scratch database is dropped afterwards.
+
+    MONGO_URL=mongodb://localhost:27017 python backend_explain.py
+
+Unfiltered reads of small collections (all skills, the admin list, the
+revocation list) scan by design and are not checked. Filters come from the
+Database query helpers; add a shape here when a query gains a new one.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import DESCENDING, MongoClient
+
+SCRATCH_DB = os.environ.get("EXPLAIN_DB_NAME", "portfolio_explain_check")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = SCRATCH_DB  # never touch the real database
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from database import Database  # noqa: E402
+
+BAD_STAGES = {"COLLSCAN", "SORT"}
+
+now = datetime.utcnow()
+day_ago = now - timedelta(days=1)
+an_id = ObjectId()
+before = (now, an_id)
+newest_first = [("createdAt", DESCENDING), ("_id", DESCENDING)]
+
+# Filters are built by the same Database helpers the queries use, so the shapes
+# checked here can't drift from the real ones.
+
+# (label, collection, filter, sort)
+FIND_QUERIES = [
+    ("get_projects", "projects", {}, [("createdAt", -1)]),
+    ("get_learning_journey", "learning_journey", {}, [("order", 1)]),
+    ("delete_skills_category", "skills", {"category": "Frontend"}, None),
+    ("get_admin_by_username", "admin", {"username": "admin"}, None),
+    ("_recent_unread_messages", "contact_messages", {"read": False}, [("createdAt", DESCENDING)]),
+    ("get_contact_message", "contact_messages", {"_id": an_id}, None),
+    ("get_notifications", "notifications", Database._notifications_query(now, [an_id]), newest_first),
+    ("get_notifications (next page)", "notifications",
+     Database._notifications_query(now, [an_id], before=before), newest_first),
+    ("get_notifications (by type)", "notifications",
+     Database._notifications_query(now, [an_id], before=before, notification_type="contact"), newest_first),
+    ("get_notifications (unread)", "notifications",
+     Database._notifications_query(now, [an_id], read=False), newest_first),
+    ("get_notifications (read)", "notifications",
+     Database._notifications_query(now, [an_id], read=True), newest_first),
+    ("get_notifications (read, next page)", "notifications",
+     Database._notifications_query(now, [an_id], before=before, read=True), newest_first),
+    ("_live_read_ids", "notifications", {"_id": {"$in": [an_id]}, "createdAt": {"$gt": now}}, None),
+    ("bulk_mark_notifications_read (to watermark)", "notifications",
+     Database._bulk_notifications_query(until=now, last_read_at=day_ago, read_ids=[an_id]),
+     [("createdAt", DESCENDING)]),
+    ("bulk_mark_notifications_read (by type)", "notifications",
+     Database._bulk_notifications_query(notification_type="contact", since=day_ago, until=now,
+                                        last_read_at=day_ago, read_ids=[an_id]), None),
+    ("bulk_mark_notifications_read (ids)", "notifications",
+     Database._bulk_notifications_query([an_id], last_read_at=day_ago, read_ids=[]), None),
+    ("bulk_delete_notifications (by type)", "notifications",
+     Database._bulk_notifications_query(notification_type="contact", since=day_ago, until=now), None),
+    ("bulk_delete_notifications (range)", "notifications",
+     Database._bulk_notifications_query(since=day_ago, until=now), None),
+    ("bulk_mark_messages_read", "contact_messages",
+     Database._bulk_messages_query(since=day_ago, until=now, read=False), None),
+    ("bulk_delete_messages (read state)", "contact_messages", Database._bulk_messages_query(read=True), None),
+    ("bulk_delete_messages (range)", "contact_messages",
+     Database._bulk_messages_query(since=day_ago, until=now, read=False), None),
+    ("bulk_delete_messages (ids)", "contact_messages", Database._bulk_messages_query([an_id], read=False), None),
+    ("is_revoked (jti)", "token_revocations", {"jti": "abc"}, None),
+    ("is_revoked (username)", "token_revocations", {"username": "admin"}, None),
+]
+
+# (label, collection, filter) for count_documents
+COUNT_QUERIES = [
+    ("dashboard unread count", "contact_messages", {"read": False}),
+    ("get_unread_notification_count", "notifications", Database._unread_filter(now, [an_id])),
+    ("bulk_mark_notifications_read (count)", "notifications",
+     Database._bulk_notifications_query(until=now, last_read_at=day_ago, read_ids=[an_id])),
+]
+
+# (label, collection, pipeline)
+AGGREGATE_QUERIES = [
+    ("get_contact_messages", "contact_messages", Database._contact_messages_pipeline()),
+    ("get_contact_messages (unread, next page)", "contact_messages",
+     Database._contact_messages_pipeline(before=before, read=False)),
+    ("get_contact_messages (date range)", "contact_messages",
+     Database._contact_messages_pipeline(since=day_ago, until=now)),
+    ("get_contact_messages (since, next page)", "contact_messages",
+     Database._contact_messages_pipeline(before=before, since=day_ago)),
+]
+
+
+def plan_stages(node):
+    """Stage names in every winning plan of an explain document"""
+    stages = []
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("rejectedPlans", "command"):
+                continue  # losing plans, and the echoed command's own $sort
+            if key == "stage" and isinstance(value, str):
+                stages.append(value)
+            elif key == "$sort":
+                stages.append("SORT")  # an aggregation sort that wasn't pushed into the query
+            else:
+                stages.extend(plan_stages(value))
+    elif isinstance(node, list):
+        for item in node:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+def check(label, explain):
+    stages = plan_stages(explain)
+    bad = BAD_STAGES.intersection(stages)
+    if bad:
+        print(f"❌ {label}: {', '.join(sorted(bad))} in plan {' <- '.join(stages)}")
+        return False
+    print(f"✅ {label}: {' <- '.join(stages)}")
+    return True
+
+
+async def apply_catalog():
+    first = await Database.create_indexes()
+    second = await Database.create_indexes()
+    return first and second
+
+
+def main():
+    mongo_url = os.environ["MONGO_URL"]
+    print(f"🔗 Checking query plans on {mongo_url}/{SCRATCH_DB}")
+    client = MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[SCRATCH_DB]
+    client.drop_database(SCRATCH_DB)
+
+    try:
+        if not asyncio.run(apply_catalog()):
+            print("❌ Index catalog could not be applied cleanly (see log above)")
+            return 1
+        print("✅ Index catalog applied twice without errors")
+
+        ok = True
+        for label, collection, query, sort in FIND_QUERIES:
+            cursor = db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            ok &= check(label, cursor.limit(100).explain())
+        for label, collection, query in COUNT_QUERIES:
+            explain = db.command("explain", {"count": collection, "query": query}, verbosity="queryPlanner")
+            ok &= check(label, explain)
+        for label, collection, pipeline in AGGREGATE_QUERIES:
+            explain = db.command("aggregate", collection, pipeline=pipeline, explain=True)
+            ok &= check(label, explain)
+    finally:
+        client.drop_database(SCRATCH_DB)
+
+    print("✅ All hot queries are index-backed" if ok else "❌ Some queries need an index (see above)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -103,10 +103,48 @@ const AdminLayout = () => {
     };
 
     fetchInitialData();
-    const intervalId = setInterval(() => {
-      fetchDashboardSummary();
-    }, 3000);
-    return () => clearInterval(intervalId);
+
+    // The server pushes a fresh summary whenever something changes,
+    // so there's no need to poll.
+    let eventSource = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const connect = async () => {
+      try {
+        eventSource = await adminApi.openEventStream();
+      } catch (error) {
+        console.error("Failed to open event stream", error);
+        retryTimer = setTimeout(connect, 5000);
+        return;
+      }
+      if (closed) {
+        eventSource.close();
+        return;
+      }
+      eventSource.addEventListener("summary", (event) => {
+        const data = JSON.parse(event.data);
+        setSummary(data);
+        setUnreadNotifCount(data.unread_notification_count);
+      });
+      // Stream tickets are single-use, so reconnect with a fresh one
+      // instead of letting EventSource retry the same URL.
+      eventSource.onerror = () => {
+        eventSource.close();
+        if (!closed) {
+          retryTimer = setTimeout(connect, 5000);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (eventSource) {
+        eventSource.close();
+      }
+    };
   }, [setAdminProfile, setSummary, setUnreadNotifCount, fetchDashboardSummary]);
 
   const navItems = [
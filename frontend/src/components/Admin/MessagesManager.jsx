@@ -18,6 +18,8 @@ import { useAdmin } from "../../context/AdminContext";
 
 const MessagesManager = () => {
   const [messages, setMessages] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [expanded, setExpanded] = useState({}); // message id -> full body
   const [loading, setLoading] = useState(true);
   const { toast } = useToast();
   const { fetchDashboardSummary } = useAdmin();
@@ -28,6 +30,7 @@ const MessagesManager = () => {
       const response = await adminApi.getMessages();
       if (response.success && response.data) {
         setMessages(response.data);
+        setNextCursor(response.next_cursor);
       }
     } catch (error) {
       handleApiError(error, toast);
@@ -36,6 +39,33 @@ const MessagesManager = () => {
     }
   };
 
+  const loadMoreMessages = async () => {
+    try {
+      const response = await adminApi.getMessages({ before: nextCursor });
+      if (response.success && response.data) {
+        setMessages((prev) => [...prev, ...response.data]);
+        setNextCursor(response.next_cursor);
+      }
+    } catch (error) {
+      handleApiError(error, toast);
+    }
+  };
+
+  const toggleMessageBody = async (messageId) => {
+    if (expanded[messageId] !== undefined) {
+      setExpanded(({ [messageId]: _, ...rest }) => rest);
+      return;
+    }
+    try {
+      const response = await adminApi.getMessage(messageId);
+      if (response.success && response.data) {
+        setExpanded((prev) => ({ ...prev, [messageId]: response.data.message }));
+      }
+    } catch (error) {
+      handleApiError(error, toast);
+    }
+  };
+
   useEffect(() => {
     fetchMessages();
   }, []);
@@ -53,6 +83,20 @@ const MessagesManager = () => {
     }
   };
 
+  const handleMarkAllAsRead = async () => {
+    try {
+      const response = await adminApi.bulkUpdateMessages({
+        action: "read",
+        all: true,
+      });
+      toast({ title: `${response.count} messages marked as read.` });
+      await fetchDashboardSummary();
+      fetchMessages(); // Refresh the list
+    } catch (error) {
+      handleApiError(error, toast);
+    }
+  };
+
   const handleMarkAsRead = async (messageId) => {
     try {
       await adminApi.markMessageRead(messageId);
@@ -91,10 +135,14 @@ const MessagesManager = () => {
         transition={{ duration: 0.5 }}
       >
         <Card className="bg-slate-800 border-slate-700 text-white shadow-lg hover:shadow-cyan-500/10 transition-shadow">
-          <CardHeader>
+          <CardHeader className="flex flex-row items-center justify-between">
             <CardTitle className="text-2xl text-cyan-400">
               Contact Messages
             </CardTitle>
+            <Button variant="outline" size="sm" onClick={handleMarkAllAsRead}>
+              <Eye className="h-4 w-4 mr-2" />
+              Mark all as read
+            </Button>
           </CardHeader>
           <CardContent>
             <Table>
@@ -135,13 +183,18 @@ const MessagesManager = () => {
                       {message.email}
                     </TableCell>
                     <TableCell
-                      className={`font-medium max-w-md truncate ${
+                      className={`font-medium max-w-md cursor-pointer ${
+                        expanded[message.id] !== undefined
+                          ? "whitespace-pre-wrap"
+                          : "truncate"
+                      } ${
                         !message.read
                           ? "bg-slate-600 text-white"
                           : "bg-slate-800/40"
                       }`}
+                      onClick={() => toggleMessageBody(message.id)}
                     >
-                      {message.message}
+                      {expanded[message.id] ?? message.preview}
                     </TableCell>
                     <TableCell
                       className={`font-medium max-w-md truncate ${
@@ -202,6 +255,13 @@ const MessagesManager = () => {
                 No messages yet.
               </p>
             )}
+            {nextCursor && (
+              <div className="flex justify-center pt-4">
+                <Button variant="outline" size="sm" onClick={loadMoreMessages}>
+                  Load more
+                </Button>
+              </div>
+            )}
           </CardContent>
         </Card>
       </motion.div>
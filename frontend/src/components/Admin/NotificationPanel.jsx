@@ -111,10 +111,17 @@ const NotificationPanel = ({
                 >
                   <Icon className={`mt-[2px] h-4 w-4 shrink-0 ${config.color}`} />
                   <div className="flex justify-between w-full">
-                    <span className="text-sm text-white">{notif.message}</span>
+                    <span className="text-sm text-white">
+                      {notif.message}
+                      {notif.count > 1 && (
+                        <span className="ml-1 text-xs text-slate-400">
+                          (×{notif.count})
+                        </span>
+                      )}
+                    </span>
                     {notif.createdAt && (
                       <span className="text-xs text-slate-400 mt-0.5">
-                        {new Date(notif.createdAt).toLocaleString()}
+                        {new Date(notif.lastSeenAt || notif.createdAt).toLocaleString()}
                       </span>
                     )}
                   </div>
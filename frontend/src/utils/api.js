@@ -46,6 +46,13 @@ api.interceptors.response.use(
 // ============================================================================
 
 export const publicApi = {
+  // All sections in one request (optionally a subset, e.g. ["profile", "skills"])
+  getPortfolio: async (sections) => {
+    const params = sections ? { sections: sections.join(",") } : undefined;
+    const response = await api.get("/portfolio", { params });
+    return response.data;
+  },
+
   // Profile
   getProfile: async () => {
     const response = await api.get("/profile");
@@ -131,8 +138,9 @@ export const adminApi = {
     await api.post("/admin/logout-notify");
   },
 
-  getNotifications: async () => {
-    const response = await api.get("/admin/notifications");
+  // params: { limit, before (next_cursor of the previous page), type, read, fields }
+  getNotifications: async (params) => {
+    const response = await api.get("/admin/notifications", { params });
     return response.data;
   },
 
@@ -148,6 +156,12 @@ export const adminApi = {
     return response.data;
   },
 
+  // payload: { action: "read" | "delete", ids: [...] } or { action, filter: { type, since, until } }
+  bulkUpdateNotifications: async (payload) => {
+    const response = await api.post("/admin/notifications/bulk", payload);
+    return response.data;
+  },
+
   clearAllNotifications: async () => {
     const response = await api.delete("/admin/notifications");
     return response.data;
@@ -184,11 +198,29 @@ export const adminApi = {
     return response.data;
   },
 
+  // Cheap typeahead completions; run the full search once the user commits
+  getSearchSuggestions: async (query, limit = 8) => {
+    const response = await api.get("/admin/search/suggest", {
+      params: { q: query, limit },
+    });
+    return response.data;
+  },
+
   getDashboardSummary: async () => {
     const response = await api.get("/admin/dashboard-summary");
     return response.data;
   },
 
+  // Live stream of "summary" and "notification" events (Server-Sent Events).
+  // EventSource can't send headers, so an authenticated request first trades
+  // the token for a short-lived, single-use ticket that goes in the URL.
+  openEventStream: async () => {
+    const response = await api.post("/admin/events/ticket");
+    return new EventSource(
+      `${API_BASE}/admin/events?ticket=${encodeURIComponent(response.data.ticket)}`
+    );
+  },
+
   uploadResume: async (file) => {
     const formData = new FormData();
     formData.append("file", file);
@@ -201,6 +233,19 @@ export const adminApi = {
     return response.data;
   },
 
+  // Profile/project images; resized WebP variants are generated server-side
+  uploadImage: async (file) => {
+    const formData = new FormData();
+    formData.append("file", file);
+
+    const response = await api.post("/admin/upload-image", formData, {
+      headers: {
+        "Content-Type": "multipart/form-data",
+      },
+    });
+    return response.data;
+  },
+
   // Profile Management
   updateProfile: async (profileData) => {
     const response = await api.put("/admin/profile", profileData);
@@ -281,8 +326,15 @@ export const adminApi = {
   },
 
   // Messages Management
-  getMessages: async () => {
-    const response = await api.get("/admin/messages");
+  // params: { limit, before (next_cursor of the previous page), read, since, until }
+  getMessages: async (params) => {
+    const response = await api.get("/admin/messages", { params });
+    return response.data;
+  },
+
+  // Full message body (listings only carry a preview)
+  getMessage: async (messageId) => {
+    const response = await api.get(`/admin/messages/${messageId}`);
     return response.data;
   },
 
@@ -296,6 +348,12 @@ export const adminApi = {
     return response.data;
   },
 
+  // payload: { action: "read" | "delete", ids: [...] } or { action, filter: { read, since, until } }
+  bulkUpdateMessages: async (payload) => {
+    const response = await api.post("/admin/messages/bulk", payload);
+    return response.data;
+  },
+
   updateFooter: async (data) => {
     const response = await api.put("/admin/footer", data);
     return response.data;
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# The backend modules import each other as top-level modules and read their
+# Mongo settings at import time; nothing here connects to a server.
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "portfolio_test")
+# Let tests set X-Forwarded-For from the TestClient's pseudo host
+os.environ.setdefault("FORWARDED_ALLOW_IPS", "testclient")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from auth import get_current_admin
+from database import Database
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    async def bulk_delete_messages(*args, **kwargs):
+        calls.append(("messages", args, kwargs))
+        return 3
+
+    async def bulk_delete_notifications(*args, **kwargs):
+        calls.append(("notifications", args, kwargs))
+        return 3
+
+    async def create_notification(*args, **kwargs):
+        return True
+
+    monkeypatch.setattr(Database, "bulk_delete_messages", bulk_delete_messages)
+    monkeypatch.setattr(Database, "bulk_delete_notifications", bulk_delete_notifications)
+    monkeypatch.setattr(Database, "create_notification", create_notification)
+    server.app.dependency_overrides[get_current_admin] = lambda: {"username": "admin"}
+    try:
+        yield TestClient(server.app), calls
+    finally:
+        server.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/api/admin/messages/bulk", "/api/admin/notifications/bulk"])
+@pytest.mark.parametrize("body", [
+    {"action": "delete"},
+    {"action": "delete", "filter": {}},
+    {"action": "delete", "filter": {"since": None, "until": None}},
+    {"action": "delete", "filter": {}, "all": True},
+    {"action": "delete", "ids": [], "all": True},
+])
+def test_empty_or_ambiguous_selector_is_rejected(client, path, body):
+    http, calls = client
+    response = http.post(path, json=body)
+    assert response.status_code == 400
+    assert calls == []
+
+
+@pytest.mark.parametrize("path", ["/api/admin/messages/bulk", "/api/admin/notifications/bulk"])
+def test_explicit_all_deletes_everything(client, path):
+    http, calls = client
+    response = http.post(path, json={"action": "delete", "all": True})
+    assert response.status_code == 200
+    assert response.json()["count"] == 3
+    assert len(calls) == 1
+
+
+def test_filter_with_a_field_is_accepted(client):
+    http, calls = client
+    response = http.post("/api/admin/messages/bulk", json={"action": "delete", "filter": {"read": True}})
+    assert response.status_code == 200
+    assert calls[0][2]["read"] is True
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+import server
+from images import ImagePipeline
+
+
+class Store:
+    def __init__(self):
+        self.blobs = []
+
+    async def put_bytes(self, data, suffix):
+        self.blobs.append(data)
+        return f"blobs/{len(self.blobs)}{suffix}"
+
+
+def test_only_local_uploads_are_processed(tmp_path):
+    Image = pytest.importorskip("PIL.Image")  # Pillow is optional
+    upload = tmp_path / "photo.png"
+    Image.new("RGB", (400, 300), "red").save(upload)
+    local = {"/static/photo.png": str(upload)}
+    saved = {}
+
+    async def load(source):
+        return None
+
+    async def save(source, variants):
+        saved[source] = variants
+        return True
+
+    pipeline = ImagePipeline(Store(), local.get, load, save, workers=1)
+
+    async def run():
+        pipeline.schedule(
+            "http://169.254.169.254/latest/meta-data/",
+            "https://example.com/photo.png",
+            "data:image/png;base64,AAAA",
+            "/static/photo.png",
+        )
+        assert list(pipeline._inflight) == ["/static/photo.png"]
+        await pipeline.shutdown()
+
+    asyncio.run(run())
+    assert list(saved) == ["/static/photo.png"]
+    assert saved["/static/photo.png"]["width"] == 400
+
+
+def test_static_paths_outside_uploads_are_not_local():
+    assert server.local_static_path("https://example.com/static/photo.png") is None
+    assert server.local_static_path("/static/../server.py") is None
+    assert server.local_static_path("/static/missing.png") is None
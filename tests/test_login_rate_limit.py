@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from database import Database
+from rate_limit import RateLimiter
+
+
+@pytest.fixture
+def client(monkeypatch):
+    attempts = []
+
+    async def authenticate_admin(username, password):
+        attempts.append(username)
+        return {"username": username} if password == "correct" else False
+
+    async def create_notification(*args, **kwargs):
+        return True
+
+    monkeypatch.setattr(server, "authenticate_admin", authenticate_admin)
+    monkeypatch.setattr(Database, "create_notification", create_notification)
+    monkeypatch.setattr(server, "login_ip_limiter", RateLimiter("login_ip", capacity=10, period=60))
+    monkeypatch.setattr(server, "login_user_limiter", RateLimiter("login_username", capacity=5, period=300))
+    return TestClient(server.app), attempts
+
+
+def login(http, username, password, ip):
+    return http.post(
+        "/api/admin/login",
+        json={"username": username, "password": password},
+        headers={"X-Forwarded-For": ip},
+    )
+
+
+def test_guesses_from_many_ips_share_the_account_budget(client):
+    http, attempts = client
+    statuses = [login(http, "admin", "guess", f"10.0.0.{i}").status_code for i in range(1, 9)]
+    assert statuses == [401] * 5 + [429] * 3
+    assert len(attempts) == 5  # rejected guesses never reach bcrypt
+
+
+def test_successful_logins_are_not_charged(client):
+    http, _ = client
+    for i in range(8):
+        assert login(http, "admin", "correct", f"10.0.1.{i}").status_code == 200
+
+
+def test_ip_budget_applies_across_accounts(client):
+    http, _ = client
+    statuses = [login(http, f"user{i}", "guess", "10.0.2.1").status_code for i in range(12)]
+    assert statuses == [401] * 10 + [429] * 2
@@ -0,0 +1,29 @@
+import asyncio
+
+from search_index import SearchIndex
+
+
+def make_index(store: dict):
+    def loader(section):
+        async def load():
+            return store.get(section)
+        return load
+
+    sections = ["profile", "footer", "projects", "skills", "learning_journey"]
+    return SearchIndex({section: loader(section) for section in sections})
+
+
+def test_singleton_seeded_after_startup_is_searchable():
+    store = {"projects": [], "skills": {}, "learning_journey": []}
+    index = make_index(store)
+
+    async def run():
+        await index.build()  # profile doesn't exist yet
+        assert (await index.search("lovelace"))["profile"] == []
+
+        # Seeded straight into the database, so no cache version was bumped
+        store["profile"] = {"name": "Ada Lovelace", "headline": "Engineer"}
+        return await index.search("lovelace")
+
+    results = asyncio.run(run())
+    assert [match["value"] for match in results["profile"]] == ["Ada Lovelace"]
@@ -0,0 +1,21 @@
+import pytest
+
+from static_files import _parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=5-", (5, 99)),
+    ("bytes=90-200", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-0", "unsatisfiable"),
+    ("bytes=100-", "unsatisfiable"),
+    ("bytes=150-160", "unsatisfiable"),
+    # Syntactically invalid ranges are ignored and the full body is sent
+    ("bytes=9-5", None),
+    ("bytes=200-100", None),
+    ("bytes=0-1,5-9", None),
+    ("items=0-9", None),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 100) == expected
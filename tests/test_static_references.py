@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+import server
+from database import Database
+from models import AdminBase, ProfileBase, ProjectBase
+
+
+def blob_url(name):
+    return f"/static/blobs/{name}"
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    docs = {
+        "profile": [{"profileImage": blob_url("face.png"), "resume_url": blob_url("cv.pdf")}],
+        "projects": [{"image": blob_url("shot.png")}, {"image": "https://example.com/x.png"}],
+        "admin": [{"profileImage": blob_url("admin.png")}, {"username": "no-image"}],
+    }
+
+    async def get_field_values(fields_by_collection):
+        return [
+            doc.get(field)
+            for name, fields in fields_by_collection.items()
+            for doc in docs.get(name, [])
+            for field in fields
+        ]
+
+    monkeypatch.setattr(Database, "get_field_values", get_field_values)
+    return docs
+
+
+def test_upload_url_fields_cover_the_models():
+    models = {"profile": ProfileBase, "projects": ProjectBase, "admin": AdminBase}
+    assert set(server.UPLOAD_URL_FIELDS) == set(models)
+    for name, fields in server.UPLOAD_URL_FIELDS.items():
+        assert set(fields) <= set(models[name].__fields__)
+    assert "profileImage" in server.UPLOAD_URL_FIELDS["admin"]
+
+
+def test_every_upload_field_is_referenced(stored):
+    referenced = asyncio.run(server.static_references())
+    assert referenced == {"blobs/face.png", "blobs/cv.pdf", "blobs/shot.png", "blobs/admin.png"}
+
+
+def test_failed_read_means_unknown(monkeypatch):
+    async def get_field_values(fields_by_collection):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(Database, "get_field_values", get_field_values)
+    assert asyncio.run(server.static_references()) is None